@@ -0,0 +1,138 @@
+"""
+Record, replay and benchmark Among Us capture sessions without a game or a Discord connection.
+
+    python -m benchmarks.amongus_replay record session.jsonl
+    python -m benchmarks.amongus_replay serve session.jsonl --speed 10
+    python -m benchmarks.amongus_replay bench session.jsonl --speed 10 --players 10
+    python -m benchmarks.amongus_replay bench --synthetic 50 --lobbies 4
+"""
+import argparse
+import asyncio
+import json
+import time
+from collections import Counter
+
+import websockets
+
+from benchmarks.fakes import FakeBot, FakeVoiceChannel
+from features.AmongusVoice import AmongUsVoice, GAME_STATE_EVENT, STATE_DISCUSSION, STATE_TASKS
+
+CAPTURE_URL = 'ws://localhost:42069/api'
+
+
+async def record(path, url=CAPTURE_URL):
+    started = time.perf_counter()
+    count = 0
+    async with websockets.connect(url) as ws:
+        print(f"Recording {url} to {path}, Ctrl+C to stop")
+        with open(path, 'w') as f:
+            async for message in ws:
+                f.write(json.dumps({"t": time.perf_counter() - started, "data": message}) + "\n")
+                f.flush()
+                count += 1
+                print(f"\r{count} events", end="")
+
+
+def load_session(path):
+    with open(path, 'r') as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def synthetic_session(meetings, interval=1.0):
+    # Tasks -> discussion -> tasks..., with a burst of duplicate states on every change like the real capture sends
+    events = []
+    t = 0.0
+    for i in range(meetings * 2):
+        state = STATE_DISCUSSION if i % 2 else STATE_TASKS
+        for _ in range(3):
+            events.append({"t": t, "data": json.dumps({"EventID": GAME_STATE_EVENT,
+                                                      "EventData": json.dumps({"NewState": state})})})
+            t += 0.01
+        t += interval
+    return events
+
+
+async def serve(events, speed=1.0, host="localhost", port=42069, done=None):
+    async def replay(ws, *args):
+        started = time.perf_counter()
+        for event in events:
+            delay = event["t"] / speed - (time.perf_counter() - started)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await ws.send(event["data"])
+        if done:
+            done.set()
+        await ws.wait_closed()
+
+    async with websockets.serve(replay, host, port) as server:
+        bound_port = server.sockets[0].getsockname()[1]
+        print(f"Replaying {len(events)} events on ws://{host}:{bound_port}/api at {speed}x")
+        await (done.wait() if done else asyncio.Future())
+        # Give the last pass time to land before the server goes away
+        await asyncio.sleep(1)
+
+
+async def bench(events, speed=1.0, lobbies=1, players=10, edit_delay=0.05, port=42170):
+    api = Counter()
+    channels = [FakeVoiceChannel(i + 1, api, size=players, edit_delay=edit_delay) for i in range(lobbies)]
+    done_events = [asyncio.Event() for _ in range(lobbies)]
+    servers = [asyncio.create_task(serve(events, speed, port=port + i, done=done_events[i])) for i in range(lobbies)]
+    await asyncio.sleep(0.2)
+
+    bot = FakeBot(channels)
+    cog = AmongUsVoice(bot, lobbies=[{"endpoint": f"ws://localhost:{port + i}/api", "channel_id": channel.id}
+                                     for i, channel in enumerate(channels)])
+    started = time.perf_counter()
+    await asyncio.gather(*servers)
+    elapsed = time.perf_counter() - started
+    cog.cog_unload()
+
+    for lobby in cog.lobbies:
+        stats = lobby.stats
+        average = stats["total_latency"] / stats["actions"] if stats["actions"] else 0
+        print(f"{lobby.endpoint}: {stats['events']} state events, {stats['actions']} passes applied, "
+              f"{stats['superseded']} superseded, latency avg {average * 1000:.1f}ms "
+              f"max {stats['max_latency'] * 1000:.1f}ms")
+    print(f"API calls: {dict(api)} in {elapsed:.2f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Among Us capture record/replay harness")
+    sub = parser.add_subparsers(dest="mode", required=True)
+
+    record_parser = sub.add_parser("record")
+    record_parser.add_argument("file")
+    record_parser.add_argument("--url", default=CAPTURE_URL)
+
+    for name in ("serve", "bench"):
+        p = sub.add_parser(name)
+        p.add_argument("file", nargs="?")
+        p.add_argument("--synthetic", type=int, default=0, help="Generate N meetings instead of reading a file")
+        p.add_argument("--speed", type=float, default=1.0)
+        if name == "serve":
+            p.add_argument("--port", type=int, default=42069)
+        else:
+            p.add_argument("--lobbies", type=int, default=1)
+            p.add_argument("--players", type=int, default=10)
+            p.add_argument("--edit-delay", type=float, default=0.05, help="Simulated member.edit round trip")
+
+    args = parser.parse_args()
+    if args.mode == "record":
+        try:
+            asyncio.run(record(args.file, args.url))
+        except KeyboardInterrupt:
+            print()
+        return
+
+    if not args.file and not args.synthetic:
+        parser.error("give a recorded session file or --synthetic N")
+    events = load_session(args.file) if args.file else synthetic_session(args.synthetic)
+
+    if args.mode == "serve":
+        asyncio.run(serve(events, args.speed, port=args.port))
+    else:
+        asyncio.run(bench(events, args.speed, args.lobbies, args.players, args.edit_delay))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+import asyncio
+from contextlib import asynccontextmanager
+
+
+class FakeVoiceState:
+    def __init__(self, channel, mute=False):
+        self.channel = channel
+        self.mute = mute
+
+
+class FakeMember:
+    def __init__(self, member_id, api, edit_delay=0.05):
+        self.id = member_id
+        self.name = f"player{member_id}"
+        self.display_name = self.name
+        self.mention = f"<@{member_id}>"
+        self.voice = None
+        self.api = api
+        self.edit_delay = edit_delay
+
+    async def edit(self, mute=None):
+        self.api["member.edit"] += 1
+        await asyncio.sleep(self.edit_delay)
+        if mute is not None:
+            self.voice.mute = mute
+
+    def __str__(self):
+        return self.name
+
+
+class FakeVoiceChannel:
+    def __init__(self, channel_id, api, size=10, edit_delay=0.05):
+        self.id = channel_id
+        self.name = f"voice{channel_id}"
+        self.api = api
+        self.members = []
+        for i in range(size):
+            member = FakeMember(channel_id * 1000 + i, api, edit_delay)
+            member.voice = FakeVoiceState(self)
+            self.members.append(member)
+
+    async def connect(self, timeout=None):
+        self.api["voice.connect"] += 1
+        return FakeVoiceClient(self.api)
+
+    def __str__(self):
+        return self.name
+
+
+class FakeVoiceClient:
+    def __init__(self, api):
+        self.api = api
+        self.source = None
+        self.after = None
+        self.paused = False
+
+    def play(self, source, after=None):
+        self.api["voice.play"] += 1
+        self.source = source
+        self.after = after
+
+    def finish(self, error=None):
+        # What discord.py's player thread does when a song ends
+        source, after = self.source, self.after
+        self.source = self.after = None
+        if source:
+            source.cleanup()
+        if after:
+            after(error)
+
+    def is_playing(self):
+        return self.source is not None and not self.paused
+
+    def is_paused(self):
+        return self.paused
+
+    def stop(self):
+        self.finish()
+
+    async def disconnect(self):
+        self.api["voice.disconnect"] += 1
+
+
+class FakeBot:
+    def __init__(self, channels=()):
+        self.loop = asyncio.get_running_loop()
+        self.channels = {channel.id: channel for channel in channels}
+        self.latency = 0.05
+        self.users = {}
+        self.cogs = {}
+
+    def get_channel(self, channel_id):
+        return self.channels.get(channel_id)
+
+    def get_user(self, user_id):
+        return self.users.get(user_id)
+
+    def get_cog(self, name):
+        return self.cogs.get(name)
+
+    async def wait_until_ready(self):
+        # Never "ready", keeps background loops like the reminder checker out of the measurements
+        await asyncio.Event().wait()
+
+
+class FakeMessage:
+    def __init__(self, api, content=None, send_delay=0.0):
+        self.api = api
+        self.content = content
+        self.send_delay = send_delay
+
+    async def edit(self, content=None, delete_after=None, **kwargs):
+        self.api["message.edit"] += 1
+        await asyncio.sleep(self.send_delay)
+        self.content = content
+
+    async def delete(self):
+        self.api["message.delete"] += 1
+        await asyncio.sleep(self.send_delay)
+
+
+class FakeTextChannel:
+    def __init__(self, channel_id, api, nsfw=True):
+        self.id = channel_id
+        self.api = api
+        self.nsfw = nsfw
+        self.sent = []
+
+    def is_nsfw(self):
+        return self.nsfw
+
+    async def send(self, content=None, **kwargs):
+        self.api["channel.send"] += 1
+        self.sent.append(content)
+        return FakeMessage(self.api, content)
+
+
+class FakeGuild:
+    def __init__(self, guild_id, filesize_limit=8 * 1024 * 1024):
+        self.id = guild_id
+        self.filesize_limit = filesize_limit
+        self.members = []
+
+
+class FakeContext:
+    """Just enough of commands.Context for the cogs, every Discord call is counted in `api`."""
+
+    def __init__(self, bot, api, author=None, guild=None, channel=None, send_delay=0.0):
+        self.bot = bot
+        self.api = api
+        self.author = author or FakeMember(1, api)
+        self.guild = guild or FakeGuild(1)
+        self.channel = channel or FakeTextChannel(1, api)
+        self.message = self
+        self.command = None
+        self.interaction = None
+        self.send_delay = send_delay
+        self.sent = []
+
+    async def send(self, content=None, *, file=None, embed=None, delete_after=None, **kwargs):
+        self.api["send"] += 1
+        if file is not None:
+            # Reading the attachment is part of what an upload costs
+            self.api["upload_bytes"] += len(file.fp.read())
+        await asyncio.sleep(self.send_delay)
+        self.sent.append(content if content is not None else embed)
+        return FakeMessage(self.api, content, self.send_delay)
+
+    async def defer(self, **kwargs):
+        pass
+
+    @asynccontextmanager
+    async def typing(self):
+        self.api["typing"] += 1
+        yield
@@ -0,0 +1,49 @@
+"""
+Compares scoring every pair of members with get_love_score against the vectorized love_matrix.
+
+    python -m benchmarks.love_bench
+    python -m benchmarks.love_bench --members 100 300 1000
+"""
+import argparse
+import random
+import string
+import time
+
+from features.irl import get_love_score, love_matrix
+
+
+def random_names(count, seed=0):
+    rng = random.Random(seed)
+    return ["".join(rng.choices(string.ascii_letters + "_ ", k=rng.randint(3, 24))) for _ in range(count)]
+
+
+def score_pairs_scalar(names):
+    return [get_love_score(names[i], names[j]) for i in range(len(names)) for j in range(i + 1, len(names))]
+
+
+def best_of(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Scalar vs vectorized love scores")
+    parser.add_argument("--members", type=int, nargs="+", default=[50, 100, 300, 500])
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    print(f"{'members':>8} {'pairs':>8} {'scalar ms':>10} {'matrix ms':>10} {'speedup':>8}")
+    for count in args.members:
+        names = random_names(count)
+        scalar = best_of(lambda: score_pairs_scalar(names), args.repeat)
+        matrix = best_of(lambda: love_matrix(names, seed=count), args.repeat)
+        print(f"{count:>8} {count * (count - 1) // 2:>8} {scalar * 1000:>10.1f} {matrix * 1000:>10.2f} "
+              f"{scalar / matrix:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Soak test: N simulated guilds issue a mix of !play, downloads, !eval, reminders and fun commands at the same
+time through the real cogs, against the stub upstreams. Reports command latency, event loop lag, RSS growth
+and leaked tasks/file descriptors/files over time.
+
+    python -m benchmarks.soak --guilds 50 --duration 60
+    python -m benchmarks.soak --guilds 200 --duration 300 --send-delay 0.05 --report-every 30
+"""
+import argparse
+import asyncio
+import os
+import random
+import time
+from collections import defaultdict
+from unittest import mock
+
+from benchmarks.fakes import FakeGuild, FakeMember, FakeTextChannel, FakeVoiceChannel, FakeVoiceState
+from benchmarks.stubs import StubUpstreams
+from benchmarks.suite import Environment, FakeAudio, SAMPLE_SONG
+from features.commands import Commands
+from features.fun import Fun
+from features.musicplayer import MusicPlayer
+from features.nsfw import NSFW
+from utils.admission import AdmissionRejected
+from utils.memory import current_rss
+
+# Relative frequency of each command in the mix
+COMMAND_MIX = {
+    "play": 2,
+    "download_youtube": 1,
+    "download_reddit": 1,
+    "eval": 1,
+    "remindme": 2,
+    "dadjoke": 2,
+    "meme": 1,
+    "r34": 1,
+}
+LAG_INTERVAL = 0.1
+
+
+def open_fds():
+    try:
+        return len(os.listdir("/proc/self/fd"))
+    except FileNotFoundError:
+        return None
+
+
+def percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * q))]
+
+
+class Soak:
+    def __init__(self, env, guilds, think_time):
+        self.env = env
+        self.guilds = guilds
+        self.think_time = think_time
+        self.latencies = defaultdict(list)
+        self.window = []
+        self.errors = defaultdict(int)
+        self.rejected = 0
+        self.lags = []
+        self.stopped = asyncio.Event()
+
+        self.commands = env.cog(Commands)
+        self.commands.reminder_system.reminders_file = os.path.join(env.work_dir, "reminders.json")
+        self.commands.reminder_system.reminders = []
+        self.music = env.cog(MusicPlayer)
+        self.fun = env.cog(Fun)
+        self.nsfw = env.cog(NSFW)
+        try:
+            from features.javascripteval import JavaScriptEval
+            self.javascript = env.cog(JavaScriptEval)
+        except ModuleNotFoundError:
+            self.javascript = None
+        self.mix = {name: weight for name, weight in COMMAND_MIX.items() if name != "eval" or self.javascript}
+
+    def command_for(self, name):
+        # Returns (cog, command, kwargs) for one invocation of the named command
+        if name == "play":
+            query = random.choice(["Sonic X Theme Song -  Gotta Go Fast", "some song nobody has downloaded"])
+            return self.music, self.music.play, {"query": query}
+        if name == "download_youtube":
+            return self.commands, self.commands.download_youtube, {"url": "https://youtu.be/stub"}
+        if name == "download_reddit":
+            return self.commands, self.commands.download_reddit, {"url": "https://reddit.com/r/stub/comments/stub"}
+        if name == "eval":
+            return self.javascript, self.javascript.eval_js, {"expression": "[...Array(1000).keys()].reduce((a, b) => a + b)"}
+        if name == "remindme":
+            return self.commands, self.commands.remind_me, {"reminder_text": "10m soak test reminder"}
+        if name == "meme":
+            return self.fun, self.fun.meme, {}
+        if name == "r34":
+            return self.nsfw, self.nsfw.r34, {"tags": "stub"}
+        return self.fun, self.fun.dadjokes, {}
+
+    async def invoke(self, ctx, name):
+        cog, command, kwargs = self.command_for(name)
+        ctx.command = command
+        started = time.perf_counter()
+        try:
+            # Admission control wraps the callback, so it is part of the picture
+            await command.callback(cog, ctx, **kwargs)
+        except AdmissionRejected:
+            self.rejected += 1
+        except Exception as e:
+            self.errors[f"{name}: {type(e).__name__}"] += 1
+        elapsed = time.perf_counter() - started
+        self.latencies[name].append(elapsed)
+        self.window.append(elapsed)
+
+    async def guild_worker(self, index):
+        api = self.env.api
+        guild = FakeGuild(1000 + index)
+        voice_channel = FakeVoiceChannel(2000 + index, api, size=0)
+        text_channel = FakeTextChannel(3000 + index, api)
+        names, weights = zip(*self.mix.items())
+
+        while not self.stopped.is_set():
+            author = FakeMember(index * 100 + random.randrange(5), api)
+            author.voice = FakeVoiceState(voice_channel)
+            ctx = self.env.context(author=author, guild=guild, channel=text_channel)
+            await self.invoke(ctx, random.choices(names, weights)[0])
+            await asyncio.sleep(random.uniform(0, self.think_time * 2))
+
+    async def songs_ending(self):
+        # discord.py's player would call `after` when a song finishes
+        while not self.stopped.is_set():
+            await asyncio.sleep(0.5)
+            voice_client = self.music.voice_client
+            if voice_client is not None and voice_client.is_playing():
+                voice_client.finish()
+
+    async def watch_lag(self):
+        while not self.stopped.is_set():
+            expected = time.perf_counter() + LAG_INTERVAL
+            await asyncio.sleep(LAG_INTERVAL)
+            self.lags.append(max(0.0, time.perf_counter() - expected))
+
+
+async def fake_download_audio(query, ctx):
+    await asyncio.sleep(0.05)
+    return SAMPLE_SONG
+
+
+async def fake_download_video(url, ctx):
+    import io
+    await asyncio.sleep(0.05)
+    result = io.BytesIO(bytes(1024 * 1024))
+    result.name = "clip.mp4"
+    return result
+
+
+def fake_reddit_download(env):
+    async def download(url, ctx):
+        await asyncio.sleep(0.05)
+        path = os.path.join(env.work_dir, f"reddit_{random.getrandbits(32):08x}.mp4")
+        with open(path, 'wb') as f:
+            f.write(bytes(1024 * 1024))
+        return path
+    return download
+
+
+async def run(guilds, duration, report_every, send_delay, think_time):
+    async with StubUpstreams(latency=0.02).patched():
+        env = Environment(send_delay)
+        with mock.patch("discord.FFmpegPCMAudio", FakeAudio), \
+                mock.patch("features.downloader.download_youtube_audio", fake_download_audio), \
+                mock.patch("features.commands.download_youtube_video", fake_download_video), \
+                mock.patch("features.commands.download_reddit_video", fake_reddit_download(env)):
+            soak = Soak(env, guilds, think_time)
+            await asyncio.sleep(0)
+            baseline_tasks = len(asyncio.all_tasks())
+            baseline_fds = open_fds()
+            baseline_rss = current_rss()
+
+            helpers = [asyncio.create_task(soak.watch_lag()), asyncio.create_task(soak.songs_ending())]
+            workers = [asyncio.create_task(soak.guild_worker(i)) for i in range(guilds)]
+
+            print(f"Soaking {guilds} guilds for {duration}s")
+            print(f"{'time':>6} {'cmds':>7} {'p50 ms':>8} {'p99 ms':>8} {'lag max ms':>11} {'rss MB':>8} "
+                  f"{'tasks':>6} {'fds':>5} {'queue':>6}")
+            started = time.perf_counter()
+            while time.perf_counter() - started < duration:
+                await asyncio.sleep(min(report_every, duration - (time.perf_counter() - started)))
+                for helper in helpers:
+                    if helper.done():
+                        # A dead helper makes the rest of the numbers meaningless
+                        helper.result()
+                        raise RuntimeError(f"{helper.get_coro().__qualname__} stopped early")
+                window, soak.window = soak.window, []
+                lags, soak.lags = soak.lags, []
+                rss = current_rss()
+                print(f"{time.perf_counter() - started:>6.0f} {len(window):>7} "
+                      f"{percentile(window, 0.5) * 1000:>8.1f} {percentile(window, 0.99) * 1000:>8.1f} "
+                      f"{max(lags, default=0) * 1000:>11.1f} {(rss or 0) / (1024 * 1024):>8.1f} "
+                      f"{len(asyncio.all_tasks()):>6} {open_fds() or 0:>5} {len(soak.music.queue):>6}")
+
+            soak.stopped.set()
+            await asyncio.gather(*workers, *helpers, return_exceptions=True)
+            await asyncio.sleep(1)
+
+            leaked_tasks = [task for task in asyncio.all_tasks() if task is not asyncio.current_task()]
+            leftover_files = [name for name in os.listdir(env.work_dir) if name != "reminders.json"]
+            rss = current_rss()
+
+            print("\nPer command latency")
+            for name, values in sorted(soak.latencies.items()):
+                print(f"  {name:<18} {len(values):>7} runs  p50 {percentile(values, 0.5) * 1000:>8.1f}ms  "
+                      f"p99 {percentile(values, 0.99) * 1000:>8.1f}ms")
+            print(f"Rejected by admission control: {soak.rejected}")
+            for error, count in sorted(soak.errors.items()):
+                print(f"Error {error}: {count}")
+            if baseline_rss and rss:
+                print(f"RSS growth: {(rss - baseline_rss) / (1024 * 1024):+.1f} MB")
+            print(f"Tasks still alive: {len(leaked_tasks)} (baseline {baseline_tasks})")
+            if baseline_fds is not None:
+                print(f"Open file descriptors: {open_fds()} (baseline {baseline_fds})")
+            print(f"Files left in the work dir: {len(leftover_files)} "
+                  f"({', '.join(sorted(leftover_files)[:5])}{', ...' if len(leftover_files) > 5 else ''})")
+            print(f"API calls: {dict(env.api)}")
+            await env.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Multi-guild soak test")
+    parser.add_argument("--guilds", type=int, default=20)
+    parser.add_argument("--duration", type=float, default=30)
+    parser.add_argument("--report-every", type=float, default=5)
+    parser.add_argument("--send-delay", type=float, default=0.02, help="Simulated Discord API round trip")
+    parser.add_argument("--think-time", type=float, default=0.5, help="Average pause between a guild's commands")
+    args = parser.parse_args()
+    asyncio.run(run(args.guilds, args.duration, args.report_every, args.send_delay, args.think_time))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+import asyncio
+import json
+from contextlib import asynccontextmanager
+from unittest import mock
+
+import aiohttp
+from aiohttp import web
+from yarl import URL
+
+IMAGE_SIZE = 256 * 1024
+IMAGE_URL = "https://files.stub/images/sample.png"
+
+
+def _post_xml(count=100):
+    posts = "".join(f'<post id="{i}" file_url="{IMAGE_URL}"/>' for i in range(count))
+    return f'<?xml version="1.0" encoding="UTF-8"?><posts count="{count}">{posts}</posts>'
+
+
+# Canned responses keyed by "<real host><path>"
+FIXTURES = {
+    "icanhazdadjoke.com/": {"joke": "I'm reading a book about anti-gravity. It's impossible to put down."},
+    "meme-api.com/gimme": {"title": "Stub meme", "postLink": "https://redd.it/stub", "url": IMAGE_URL,
+                           "subreddit": "stub"},
+    "api.thecatapi.com/v1/images/search": [{"url": IMAGE_URL}],
+    "dog.ceo/api/breeds/image/random": {"message": IMAGE_URL},
+    "e621.net/posts.json": {"posts": [{"id": i, "file": {"url": IMAGE_URL}} for i in range(320)]},
+}
+
+
+class StubUpstreams:
+    """
+    Local HTTP server standing in for every external API the cogs talk to.
+    While `patched()` is active every aiohttp request is rerouted to it, so cogs run unmodified and offline.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = 0
+        self.image = bytes(IMAGE_SIZE)
+        self.base_url = None
+        self._runner = None
+
+    async def _handle(self, request):
+        self.requests += 1
+        if self.latency:
+            await asyncio.sleep(self.latency)
+
+        key = request.match_info["path"]
+        host = key.split("/", 1)[0]
+        if host == "files.stub":
+            return web.Response(body=self.image, content_type="image/png")
+        if key.startswith("rule34.xxx/"):
+            return web.Response(text=_post_xml(), content_type="text/xml")
+        if key in FIXTURES:
+            return web.Response(text=json.dumps(FIXTURES[key]), content_type="application/json")
+        return web.Response(status=404)
+
+    async def start(self):
+        app = web.Application()
+        app.router.add_route("*", "/{path:.*}", self._handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, "127.0.0.1", 0)
+        await site.start()
+        port = site._server.sockets[0].getsockname()[1]
+        self.base_url = URL(f"http://127.0.0.1:{port}")
+
+    async def stop(self):
+        if self._runner:
+            await self._runner.cleanup()
+
+    @asynccontextmanager
+    async def patched(self):
+        await self.start()
+        original = aiohttp.ClientSession._request
+        base_url = self.base_url
+
+        async def rerouted(session, method, str_or_url, **kwargs):
+            url = URL(str(str_or_url))
+            if url.host not in ("127.0.0.1", "localhost"):
+                url = base_url.with_path(f"/{url.host}{url.path}").with_query(url.query)
+            return await original(session, method, url, **kwargs)
+
+        try:
+            with mock.patch.object(aiohttp.ClientSession, "_request", rerouted):
+                yield self
+        finally:
+            await self.stop()
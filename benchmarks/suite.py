@@ -0,0 +1,267 @@
+"""
+Offline benchmarks for the cogs. Every command runs through its real cog method against a fake Context
+and stub upstream servers, no Discord connection or internet needed.
+
+    python -m benchmarks.suite
+    python -m benchmarks.suite --only fun nsfw --iterations 100
+    python -m benchmarks.suite --save before.json
+    python -m benchmarks.suite --compare before.json
+
+Downloads can't reach YouTube or Reddit offline, so download_youtube/download_reddit get a canned
+result from the downloader and measure the delivery path (size checks, attachment, cleanup).
+"""
+import argparse
+import asyncio
+import io
+import json
+import os
+import shutil
+import statistics
+import tempfile
+import time
+import tracemalloc
+from collections import Counter
+from unittest import mock
+
+import discord
+
+from benchmarks.fakes import FakeBot, FakeContext, FakeVoiceClient
+from benchmarks.stubs import StubUpstreams
+
+BENCHMARKS = {}
+SAMPLE_SONG = os.path.join("music", "songs", "Sonic X Theme Song -  Gotta Go Fast.mp3")
+
+
+def benchmark(name):
+    def decorator(func):
+        BENCHMARKS[name] = func
+        return func
+    return decorator
+
+
+class FakeAudio(discord.AudioSource):
+    """Stands in for FFmpegPCMAudio so play_next doesn't spawn ffmpeg."""
+
+    def __init__(self, source, **kwargs):
+        self.source = source
+
+    def read(self):
+        return bytes(3840)
+
+
+class Environment:
+    def __init__(self, send_delay=0.0):
+        self.api = Counter()
+        self.bot = FakeBot()
+        self.send_delay = send_delay
+        self.cogs = {}
+        self.work_dir = tempfile.mkdtemp(prefix="bench_")
+
+    def context(self, **kwargs):
+        return FakeContext(self.bot, self.api, send_delay=self.send_delay, **kwargs)
+
+    def cog(self, cls):
+        if cls not in self.cogs:
+            self.cogs[cls] = self.bot.cogs[cls.__cog_name__] = cls(self.bot)
+        return self.cogs[cls]
+
+    async def close(self):
+        for cog in self.cogs.values():
+            unload = getattr(cog, "cog_unload", None)
+            if unload and asyncio.iscoroutine(result := unload()):
+                await result
+        shutil.rmtree(self.work_dir, ignore_errors=True)
+
+
+@benchmark("fun.dadjoke")
+async def fun_dadjoke(env):
+    from features.fun import Fun
+    cog = env.cog(Fun)
+    await cog.dadjokes.callback(cog, env.context())
+
+
+@benchmark("fun.meme")
+async def fun_meme(env):
+    from features.fun import Fun
+    cog = env.cog(Fun)
+    await cog.meme.callback(cog, env.context())
+
+
+@benchmark("fun.cat")
+async def fun_cat(env):
+    from features.fun import Fun
+    cog = env.cog(Fun)
+    await cog.cat.callback(cog, env.context())
+
+
+@benchmark("nsfw.r34")
+async def nsfw_r34(env):
+    from features.nsfw import NSFW
+    cog = env.cog(NSFW)
+    await cog.r34.callback(cog, env.context(), tags="stub")
+
+
+@benchmark("nsfw.e621")
+async def nsfw_e621(env):
+    from features.nsfw import NSFW
+    cog = env.cog(NSFW)
+    await cog.e621.callback(cog, env.context(), tags="stub")
+
+
+@benchmark("commands.download_youtube")
+async def commands_download_youtube(env):
+    from features.commands import Commands
+
+    async def canned(url, ctx):
+        result = io.BytesIO(bytes(2 * 1024 * 1024))
+        result.name = "clip.mp4"
+        return result
+
+    cog = env.cog(Commands)
+    with mock.patch("features.commands.download_youtube_video", canned):
+        await cog.download_youtube.callback(cog, env.context(), url="https://youtu.be/stub")
+
+
+@benchmark("commands.download_reddit")
+async def commands_download_reddit(env):
+    from features.commands import Commands
+
+    async def canned(url, ctx):
+        path = os.path.join(env.work_dir, "reddit.mp4")
+        with open(path, 'wb') as f:
+            f.write(bytes(3 * 1024 * 1024))
+        return path
+
+    cog = env.cog(Commands)
+    with mock.patch("features.commands.download_reddit_video", canned):
+        await cog.download_reddit.callback(cog, env.context(), url="https://reddit.com/r/stub/comments/stub")
+
+
+@benchmark("javascript.eval")
+async def javascript_eval(env):
+    from features.javascripteval import JavaScriptEval
+    cog = env.cog(JavaScriptEval)
+    await cog.eval_js.callback(cog, env.context(), expression="[...Array(1000).keys()].map(x => x * x).length")
+
+
+@benchmark("reminder.add")
+async def reminder_add(env):
+    from features.reminder import ReminderSystem
+    system = env.cogs.get("reminders")
+    if system is None:
+        system = env.cogs["reminders"] = ReminderSystem()
+        system.reminders_file = os.path.join(env.work_dir, "reminders.json")
+        system.reminders = []
+    system.add_reminder(1, 1, "1d", "benchmark reminder", 1)
+
+
+@benchmark("reminder.check")
+async def reminder_check(env):
+    from features.reminder import ReminderSystem
+    system = env.cogs.get("reminders_check")
+    if system is None:
+        system = env.cogs["reminders_check"] = ReminderSystem()
+        system.reminders_file = os.path.join(env.work_dir, "reminders_check.json")
+        system.reminders = []
+        for _ in range(1000):
+            system.add_reminder(1, 1, "1d", "pending reminder", 1)
+    system.check_reminders()
+
+
+@benchmark("music.play_next")
+async def music_play_next(env):
+    from features.musicplayer import MusicPlayer
+    cog = env.cog(MusicPlayer)
+    if cog.voice_client is None:
+        cog.voice_client = FakeVoiceClient(env.api)
+    cog.voice_client.source = None
+    cog.queue.append(SAMPLE_SONG)
+    with mock.patch("discord.FFmpegPCMAudio", FakeAudio):
+        await cog.play_next(env.context())
+
+
+async def run_benchmark(name, func, iterations, stubs, send_delay=0.0):
+    env = Environment(send_delay)
+    try:
+        for _ in range(2):
+            await func(env)
+
+        stubs_before = stubs.requests
+        before = env.api.copy()
+        timings = []
+        for _ in range(iterations):
+            started = time.perf_counter()
+            await func(env)
+            timings.append(time.perf_counter() - started)
+        calls = env.api - before
+        calls["upstream_http"] = stubs.requests - stubs_before
+
+        tracemalloc.start()
+        peaks = []
+        for _ in range(min(iterations, 5)):
+            baseline = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+            await func(env)
+            peaks.append(tracemalloc.get_traced_memory()[1] - baseline)
+        tracemalloc.stop()
+    finally:
+        await env.close()
+
+    timings.sort()
+    return {
+        "mean_ms": statistics.mean(timings) * 1000,
+        "p50_ms": timings[len(timings) // 2] * 1000,
+        "p95_ms": timings[int(len(timings) * 0.95) - 1] * 1000,
+        "alloc_kb": max(peaks) / 1024,
+        "api_calls": {call: count / iterations for call, count in sorted(calls.items()) if count},
+    }
+
+
+async def run_suite(names, iterations, send_delay):
+    results = {}
+    async with StubUpstreams().patched() as stubs:
+        for name in names:
+            try:
+                results[name] = await run_benchmark(name, BENCHMARKS[name], iterations, stubs, send_delay)
+            except ModuleNotFoundError as e:
+                print(f"{name}: skipped ({e})")
+    return results
+
+
+def print_results(results, previous=None):
+    print(f"{'benchmark':<28} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'alloc KB':>9}  api calls / run")
+    for name, result in results.items():
+        line = (f"{name:<28} {result['mean_ms']:>9.2f} {result['p50_ms']:>9.2f} {result['p95_ms']:>9.2f} "
+                f"{result['alloc_kb']:>9.1f}  "
+                + ", ".join(f"{call}={count:.10g}" for call, count in result["api_calls"].items()))
+        if previous and name in previous:
+            change = (result["mean_ms"] - previous[name]["mean_ms"]) / previous[name]["mean_ms"] * 100
+            line += f"  ({change:+.1f}% mean)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline cog benchmarks")
+    parser.add_argument("--only", nargs="+", help="Benchmark name prefixes to run")
+    parser.add_argument("--iterations", type=int, default=50)
+    parser.add_argument("--send-delay", type=float, default=0.0, help="Simulated Discord API round trip")
+    parser.add_argument("--save", help="Write the results to this JSON file")
+    parser.add_argument("--compare", help="JSON file from an earlier --save to compare against")
+    args = parser.parse_args()
+
+    names = [name for name in BENCHMARKS if not args.only or any(name.startswith(prefix) for prefix in args.only)]
+    results = asyncio.run(run_suite(names, args.iterations, args.send_delay))
+
+    previous = None
+    if args.compare:
+        with open(args.compare, 'r') as f:
+            previous = json.load(f)
+    print_results(results, previous)
+
+    if args.save:
+        with open(args.save, 'w') as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
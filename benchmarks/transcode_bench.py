@@ -0,0 +1,57 @@
+"""
+Compares single-process and segment-parallel transcoding at different worker counts.
+
+    python -m benchmarks.transcode_bench                     # generates a 10 minute test clip
+    python -m benchmarks.transcode_bench video.mp4 --workers 1 2 4 8
+
+Uses compress_file's options. compress_file has no caller in the bot, so this is the only place the
+segment-parallel path runs today.
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from utils.parallel_transcode import ffmpeg, transcode
+
+# Same options as compress_file
+OUTPUT_KWARGS = {"video_bitrate": 1_000_000, "vf": 'scale=-1:720'}
+
+
+def generate_input(path, duration):
+    video = ffmpeg.input(f"testsrc=duration={duration}:size=1920x1080:rate=30", format='lavfi')
+    audio = ffmpeg.input(f"sine=frequency=440:duration={duration}", format='lavfi')
+    ffmpeg.output(video, audio, path, vcodec='libx264', preset='ultrafast', acodec='aac', loglevel='error') \
+        .overwrite_output().run()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Segment-parallel transcode benchmark")
+    parser.add_argument("input", nargs="?", help="Media file to transcode, a test clip is generated if omitted")
+    parser.add_argument("--duration", type=int, default=600, help="Length of the generated clip in seconds")
+    parser.add_argument("--workers", type=int, nargs="+")
+    args = parser.parse_args()
+
+    cpu_count = os.cpu_count() or 1
+    worker_counts = args.workers or sorted({1, 2, 4, cpu_count} & set(range(1, cpu_count + 1)))
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        input_path = args.input
+        if not input_path:
+            input_path = os.path.join(work_dir, "input.mp4")
+            print(f"Generating a {args.duration}s test clip...")
+            generate_input(input_path, args.duration)
+
+        baseline = None
+        print(f"{'workers':>8} {'seconds':>10} {'speedup':>8}")
+        for workers in worker_counts:
+            output_path = os.path.join(work_dir, f"output_{workers}.mp4")
+            started = time.perf_counter()
+            transcode(input_path, output_path, OUTPUT_KWARGS, workers=workers)
+            elapsed = time.perf_counter() - started
+            baseline = baseline or elapsed
+            print(f"{workers:>8} {elapsed:>10.2f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,167 @@
 import asyncio
 import json
-import websockets
+import random
+import time
 from discord.ext import commands
+from utils.handoff import take_over
+from utils.lazy_import import lazy_import
+from utils.voice_state import set_mute
 
+websockets = lazy_import("websockets")
 
-class AmongUsVoice(commands.Cog):
-    def __init__(self, bot):
-        self.bot = bot
-        self.channel_id = 1320854477464404090
-        self.bot.loop.create_task(self.connect_capture())
+GAME_STATE_EVENT = 0
+STATE_TASKS = 1
+STATE_DISCUSSION = 2
+
+RECONNECT_BASE_DELAY = 1
+RECONNECT_MAX_DELAY = 60
+
+LOBBIES_FILE = "data/amongus_lobbies.json"
+DEFAULT_LOBBIES = [{"endpoint": "ws://localhost:42069/api", "channel_id": 1320854477464404090}]
+
+
+def load_lobbies(path=LOBBIES_FILE):
+    """
+    Reads the lobbies to watch, a JSON list of {"endpoint": capture websocket URL, "channel_id": voice channel id}.
+    Falls back to DEFAULT_LOBBIES when the file doesn't exist, raises ValueError when it is malformed.
+    """
+    try:
+        with open(path, 'r') as f:
+            lobbies = json.load(f)
+    except FileNotFoundError:
+        return DEFAULT_LOBBIES
+
+    if not isinstance(lobbies, list) or not all(
+            isinstance(lobby, dict) and isinstance(lobby.get("endpoint"), str)
+            and isinstance(lobby.get("channel_id"), int) for lobby in lobbies):
+        raise ValueError(f"{path} must be a list of {{\"endpoint\": str, \"channel_id\": int}} objects")
+    return lobbies
+
+
+class Lobby:
+    """One capture endpoint driving one voice channel, all state is kept per lobby."""
+
+    def __init__(self, cog, endpoint, channel_id):
+        self.cog = cog
+        self.endpoint = endpoint
+        self.channel_id = channel_id
+        self.applied_state = None
+        self.pending_state = None
+        self.apply_task = None
+        self.stats = {"events": 0, "actions": 0, "superseded": 0, "last_latency": 0.0, "max_latency": 0.0,
+                      "total_latency": 0.0}
 
     async def connect_capture(self):
+        attempt = 0
         while True:
             try:
-                async with websockets.connect('ws://localhost:42069/api') as ws:
+                async with websockets.connect(self.endpoint) as ws:
+                    attempt = 0
                     await self.handle_states(ws)
-            except:
-                await asyncio.sleep(5)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                print(f"Capture connection to {self.endpoint} lost: {e}")
+
+            delay = min(RECONNECT_MAX_DELAY, RECONNECT_BASE_DELAY * 2 ** attempt)
+            attempt += 1
+            await asyncio.sleep(random.uniform(0, delay))
 
     async def handle_states(self, ws):
-        while True:
-            data = json.loads(await ws.recv())
-            if data['EventID'] == 0:
-                state = json.loads(data['EventData'])['NewState']
-                channel = self.bot.get_channel(self.channel_id)
-                if channel:
-                    if state == 2:
-                        await self.unmute_all(channel)
-                    elif state == 1:
-                        await self.mute_all(channel)
-            await asyncio.sleep(2)
+        # Drain the socket as fast as it delivers, only the newest state gets applied
+        async for message in ws:
+            received_at = time.perf_counter()
+            data = json.loads(message)
+            if data['EventID'] != GAME_STATE_EVENT:
+                continue
+
+            self.stats["events"] += 1
+            state = json.loads(data['EventData'])['NewState']
+            self.schedule_state(state, received_at)
+
+    def schedule_state(self, state, received_at):
+        if self.apply_task and not self.apply_task.done():
+            # A duplicate of the pass already running shouldn't restart it
+            if state == self.pending_state:
+                return
+            self.apply_task.cancel()
+            self.stats["superseded"] += 1
+        elif state == self.applied_state:
+            return
+
+        self.pending_state = state
+        self.apply_task = asyncio.create_task(self.apply_state(state, received_at))
+
+    async def apply_state(self, state, received_at):
+        channel = self.cog.bot.get_channel(self.channel_id)
+        if channel:
+            if state == STATE_DISCUSSION:
+                await self.cog.unmute_all(channel)
+            elif state == STATE_TASKS:
+                await self.cog.mute_all(channel)
+
+        self.applied_state = state
+        latency = time.perf_counter() - received_at
+        self.stats["actions"] += 1
+        self.stats["last_latency"] = latency
+        self.stats["total_latency"] += latency
+        self.stats["max_latency"] = max(self.stats["max_latency"], latency)
+
+    def stop(self):
+        if self.apply_task and not self.apply_task.done():
+            self.apply_task.cancel()
+
+
+class AmongUsVoice(commands.Cog):
+    def __init__(self, bot, lobbies=None):
+        self.bot = bot
+        state = take_over(self.qualified_name)
+        if state:
+            # Reloaded with !reload, pick up where the previous lobbies were
+            lobbies = state["lobbies"]
+        elif lobbies is None:
+            lobbies = load_lobbies()
+
+        self.lobbies = []
+        for data in lobbies:
+            lobby = Lobby(self, data["endpoint"], data["channel_id"])
+            lobby.applied_state = data.get("applied_state")
+            lobby.stats.update(data.get("stats", {}))
+            self.lobbies.append(lobby)
+        self.tasks = [self.bot.loop.create_task(lobby.connect_capture()) for lobby in self.lobbies]
+
+        if state:
+            # The previous capture connections stay open until these are started, so no lobby goes unwatched
+            for task in state["tasks"]:
+                task.cancel()
+
+    def export_state(self):
+        # Only plain data, the reloaded module builds its own Lobby objects from it.
+        # A pass still being applied could leave the channel in either state, so the new lobby applies the next one
+        lobbies = [{"endpoint": lobby.endpoint, "channel_id": lobby.channel_id,
+                    "applied_state": None if lobby.apply_task and not lobby.apply_task.done() else lobby.applied_state,
+                    "stats": dict(lobby.stats)}
+                   for lobby in self.lobbies]
+        return {"lobbies": lobbies, "tasks": self.tasks}
+
+    def cog_unload(self):
+        # The reloaded cog cancels the handed off capture connections once its own are running
+        state = take_over(self.qualified_name)
+        if state and state["tasks"] is self.tasks:
+            return
+        for lobby in self.lobbies:
+            lobby.stop()
+        for task in self.tasks:
+            task.cancel()
 
     async def mute_all(self, channel):
-        for member in channel.members:
-            try:
-                await member.edit(mute=True)
-            except Exception as e:
-                print(f"Failed to mute {member}: {e}")
+        for member, error in await set_mute(channel.members, True):
+            print(f"Failed to mute {member}: {error}")
 
     async def unmute_all(self, channel):
-        for member in channel.members:
-            try:
-                await member.edit(mute=False)
-            except Exception as e:
-                print(f"Failed to unmute {member}: {e}")
+        for member, error in await set_mute(channel.members, False):
+            print(f"Failed to unmute {member}: {error}")
+
+
+async def setup(bot):
+    await bot.add_cog(AmongUsVoice(bot))
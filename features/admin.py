@@ -1,5 +1,11 @@
 from discord.ext import commands
 import discord
+from utils.admission import admission
+from utils.handoff import finish_reload, hand_off
+from utils.loop_watchdog import watchdog
+from utils.memory import current_rss
+from utils.metrics import metrics
+from utils.voice_state import set_mute
 
 
 class Admin(commands.Cog):
@@ -58,9 +64,12 @@ class Admin(commands.Cog):
     async def mute_all(self, ctx: commands.Context):
         if ctx.author.id == self.owner_id or ctx.author.id == 567375786718265378:
             if ctx.author.voice:
-                for member in ctx.author.voice.channel.members:
-                    await member.edit(mute=True)
-                await ctx.send("Everyone muted!")
+                failed = await set_mute(ctx.author.voice.channel.members, True)
+                if failed:
+                    names = ", ".join(member.display_name for member, _ in failed)
+                    await ctx.send(f"Everyone muted except: {names}")
+                else:
+                    await ctx.send("Everyone muted!")
             else:
                 await ctx.send("You need to be in a voice channel to use this command!")
         else:
@@ -71,11 +80,84 @@ class Admin(commands.Cog):
     async def unmute_all(self, ctx: commands.Context):
         if ctx.author.id == self.owner_id or ctx.author.id == 567375786718265378:
             if ctx.author.voice:
-                for member in ctx.author.voice.channel.members:
-                    await member.edit(mute=False)
-                await ctx.send("Everyone unmuted!")
+                failed = await set_mute(ctx.author.voice.channel.members, False)
+                if failed:
+                    names = ", ".join(member.display_name for member, _ in failed)
+                    await ctx.send(f"Everyone unmuted except: {names}")
+                else:
+                    await ctx.send("Everyone unmuted!")
             else:
                 await ctx.send("You need to be in a voice channel to use this command!")
         else:
             await ctx.send("You don't have permission to do that!")
 
+    @commands.hybrid_command("memstats", help="Show cache sizes and memory usage", catalogue="Admin")
+    async def mem_stats(self, ctx: commands.Context):
+        if ctx.author.id == self.owner_id:
+            rss = current_rss()
+            rss_text = f"{rss / (1024 * 1024):.1f} MB" if rss is not None else "unknown"
+            cached_members = sum(len(guild.members) for guild in self.bot.guilds)
+            await ctx.send(
+                f"🧠 RSS: {rss_text}\n"
+                f"Guilds: {len(self.bot.guilds)}\n"
+                f"Cached members: {cached_members}\n"
+                f"Cached users: {len(self.bot.users)}\n"
+                f"Cached messages: {len(self.bot.cached_messages)}\n"
+                f"Voice clients: {len(self.bot.voice_clients)}\n"
+                f"Intents: members={self.bot.intents.members}, presences={self.bot.intents.presences}"
+            )
+        else:
+            await ctx.send("You don't have permission to do that!")
+
+    @commands.hybrid_command("stats", help="Show command latency and error statistics", catalogue="Admin")
+    async def stats(self, ctx: commands.Context):
+        if ctx.author.id == self.owner_id:
+            lines = [f"📊 Event loop lag: {metrics.loop_lag * 1000:.1f}ms (max {metrics.max_loop_lag * 1000:.1f}ms)"]
+            for name, histogram in sorted(metrics.command_latency.items(), key=lambda item: -item[1].count):
+                errors = metrics.command_results[(name, "error")]
+                lines.append(f"`{name}`: {histogram.count} calls, {errors} errors, "
+                             f"p50 ≤ {histogram.quantile(0.5) * 1000:.0f}ms, p99 ≤ {histogram.quantile(0.99) * 1000:.0f}ms")
+            for host, histogram in sorted(metrics.http_latency.items()):
+                lines.append(f"🌐 {host}: {histogram.count} requests, avg {histogram.total / histogram.count * 1000:.0f}ms, "
+                             f"{metrics.http_errors[host]} errors")
+            for name, count in sorted(metrics.counters.items()):
+                lines.append(f"{name}: {count}")
+            lines.append(f"🚦 Heavy command capacity: {admission.in_use}/{admission.capacity} in use, "
+                         f"{admission.waiting} waiting, {admission.rejected} rejected")
+            await ctx.send("\n".join(lines)[:2000])
+        else:
+            await ctx.send("You don't have permission to do that!")
+
+    @commands.hybrid_command("blocking", help="Show the code that blocked the event loop the most", catalogue="Admin")
+    async def blocking(self, ctx: commands.Context, stacks: bool = False):
+        if ctx.author.id == self.owner_id:
+            await ctx.send(f"```\n{watchdog.report(with_stacks=stacks)[:1980]}```")
+        else:
+            await ctx.send("You don't have permission to do that!")
+
+    @commands.hybrid_command("reload", help="Reload a cog's code without restarting the bot", catalogue="Admin")
+    async def reload(self, ctx: commands.Context, cog_name: str):
+        if ctx.author.id == self.owner_id:
+            # Accepts the cog name or its module name, e.g. MusicPlayer or musicplayer
+            cog = next((cog for name, cog in self.bot.cogs.items()
+                        if cog_name.lower() in (name.lower(), cog.__module__.rsplit(".", 1)[-1].lower())), None)
+            if cog is None:
+                return await ctx.send(f"❌ No cog named {cog_name}")
+
+            name, extension = cog.qualified_name, cog.__module__
+            try:
+                hand_off(cog)
+                # On failure discord.py sets the old version up again, which takes over the same state
+                await self.bot.reload_extension(extension)
+            except commands.ExtensionError as e:
+                await ctx.send(f"❌ Reload failed, kept the old version: {e}")
+            else:
+                await ctx.send(f"🔄 Reloaded {name}")
+            finally:
+                finish_reload(name)
+        else:
+            await ctx.send("You don't have permission to do that!")
+
+
+async def setup(bot):
+    await bot.add_cog(Admin(bot))
@@ -1,54 +1,60 @@
 import discord
 from discord.ext import commands, tasks
 from features.downloader import download_youtube_video, download_reddit_video
-from utils.uploader import upload_to_temp
-from features.reminder import ReminderSystem
+from utils.uploader import upload_limit, upload_to_temp
+from utils.admission import admission
+from utils.handoff import take_over
+from utils.interaction import defer_once
+from features.reminder import ReminderSystem, SharedReminderSystem
+from utils.shared_store import SharedStore
+import io
 import os
+import tempfile
 
 
 class Commands(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
-        self.reminder_system = ReminderSystem()
+        state = take_over(self.qualified_name)
+        shared_store_path = os.getenv("SHARED_STORE")
+        if state:
+            self.reminder_system = state["reminder_system"]
+        elif shared_store_path:
+            self.reminder_system = SharedReminderSystem(SharedStore(shared_store_path))
+        else:
+            self.reminder_system = ReminderSystem()
         if not self.check_reminders.is_running():
             self.check_reminders.start()
 
-    @commands.hybrid_command(name="download_youtube", help="Download a YouTube video or short", catalogue="Downloader")
-    async def download_youtube(self, ctx: commands.Context, url: str):
-        await ctx.defer()
+    async def deliver_download(self, ctx: commands.Context, result):
+        # Downloads come back either as an in-memory buffer or as a file path
+        file_path = None
+        limit = upload_limit(ctx)
         try:
-            file_path = await download_youtube_video(url, ctx)
-            file_size = os.path.getsize(file_path)
+            if result is None:
+                await ctx.send("❌ Download failed.")
+                return
 
-            if file_size > 100 * 1024 * 1024:
-                await ctx.send(
-                    f"⚠️ Max file size exceeded! Size: {file_size / (1024 * 1024):.2f} MB (100 MB limit)")
-            elif file_size > 8 * 1024 * 1024:
-                await ctx.send("⚠️ File is too large, uploading to a temporary host instead...")
-                link = upload_to_temp(file_path)
-                parts = link.split('/')
-                modified_link = f"https://tmpfiles.org/dl/{parts[3]}/{parts[4]}"
-                await ctx.send(f"✅ Upload complete! {modified_link}")
+            if isinstance(result, io.BytesIO):
+                file_size = result.getbuffer().nbytes
+                if file_size <= limit:
+                    await ctx.send("✅ Download complete!", file=discord.File(result, filename=result.name))
+                    return
+                # Bigger than expected, spill to disk for the temporary host
+                os.makedirs("downloads", exist_ok=True)
+                with tempfile.NamedTemporaryFile(dir="downloads", suffix=os.path.splitext(result.name)[1],
+                                                 delete=False) as f:
+                    f.write(result.getbuffer())
+                    file_path = f.name
             else:
-                await ctx.send("✅ Download complete!", file=discord.File(file_path))
-
-            os.remove(file_path)
-        except Exception as e:
-            await ctx.send(f"❌ An unexpected error occurred: {str(e)}")
-            if 'file_path' in locals() and os.path.exists(file_path):
-                os.remove(file_path)
+                file_path = result
 
-    @commands.hybrid_command(name="download_reddit", help="Download a Reddit video", catalogue="Downloader")
-    async def download_reddit(self, ctx: commands.Context, url: str):
-        await ctx.defer()
-        try:
-            file_path = await download_reddit_video(url, ctx)
             file_size = os.path.getsize(file_path)
 
             if file_size > 100 * 1024 * 1024:
                 await ctx.send(
                     f"⚠️ Max file size exceeded! Size: {file_size / (1024 * 1024):.2f} MB (100 MB limit)")
-            elif file_size > 8 * 1024 * 1024:
+            elif file_size > limit:
                 await ctx.send("⚠️ File is too large, uploading to a temporary host instead...")
                 link = upload_to_temp(file_path)
                 parts = link.split('/')
@@ -56,13 +62,24 @@ class Commands(commands.Cog):
                 await ctx.send(f"✅ Upload complete! {modified_link}")
             else:
                 await ctx.send("✅ Download complete!", file=discord.File(file_path))
-
-            os.remove(file_path)
         except Exception as e:
             await ctx.send(f"❌ An unexpected error occurred: {str(e)}")
-            if 'file_path' in locals() and os.path.exists(file_path):
+        finally:
+            if file_path and os.path.exists(file_path):
                 os.remove(file_path)
 
+    @commands.hybrid_command(name="download_youtube", help="Download a YouTube video or short", catalogue="Downloader")
+    @admission.limit()
+    async def download_youtube(self, ctx: commands.Context, url: str):
+        await defer_once(ctx)
+        await self.deliver_download(ctx, await download_youtube_video(url, ctx))
+
+    @commands.hybrid_command(name="download_reddit", help="Download a Reddit video", catalogue="Downloader")
+    @admission.limit()
+    async def download_reddit(self, ctx: commands.Context, url: str):
+        await defer_once(ctx)
+        await self.deliver_download(ctx, await download_reddit_video(url, ctx))
+
     @commands.hybrid_command(name='remindme', help='Set a reminder, e.g. !remindme 1d 2h 3m 4s Some reminder text',
                       catalogue="Misc")
     async def remind_me(self, ctx: commands.Context, *, reminder_text: str):
@@ -72,7 +89,8 @@ class Commands(commands.Cog):
             return
 
         time_str, message = parts[0], parts[1]
-        success, response = self.reminder_system.add_reminder(ctx.author.id, ctx.channel.id, time_str, message)
+        success, response = self.reminder_system.add_reminder(ctx.author.id, ctx.channel.id, time_str, message,
+                                                               ctx.guild.id if ctx.guild else None)
 
         if success:
             await ctx.send(f"✅ I'll remind you about '{message}' at {response}")
@@ -88,9 +106,18 @@ class Commands(commands.Cog):
         await ctx.send(
             "🔗 Invite me to your server: https://discord.com/oauth2/authorize?client_id=1129457269642362900")
 
+    def owns_reminder(self, reminder):
+        # With several shard processes only the one holding the reminder's guild sends it, DMs go to shard 0
+        shard_ids = getattr(self.bot, "shard_ids", None)
+        if not shard_ids:
+            return True
+        guild_id = reminder.get("guild_id")
+        shard_id = (guild_id >> 22) % self.bot.shard_count if guild_id else 0
+        return shard_id in shard_ids
+
     @tasks.loop(seconds=30)
     async def check_reminders(self):
-        for reminder in self.reminder_system.check_reminders():
+        for reminder in await self.reminder_system.pop_due_reminders(self.owns_reminder):
             try:
                 channel = self.bot.get_channel(reminder["channel_id"])
                 if channel:
@@ -103,5 +130,16 @@ class Commands(commands.Cog):
             except Exception as e:
                 print(f"Error sending reminder: {e}")
 
+    @check_reminders.before_loop
+    async def before_check_reminders(self):
+        await self.bot.wait_until_ready()
+
+    def export_state(self):
+        return {"reminder_system": self.reminder_system}
+
     def cog_unload(self):
         self.check_reminders.cancel()
+
+
+async def setup(bot):
+    await bot.add_cog(Commands(bot))
@@ -1,11 +1,19 @@
 import asyncio
+import io
 import os
 import re
 import discord
-from redvid import Downloader
-import ffmpeg
 from discord.ext import commands
-from pytube import YouTube, Search
+from utils.lazy_import import lazy_import
+from utils.progress import ProgressMessage
+from utils.suggestions import suggestions
+from utils.uploader import upload_limit
+
+ffmpeg = lazy_import("ffmpeg")
+pytube = lazy_import("pytube")
+redvid = lazy_import("redvid")
+
+MUSIC_PATH = "music/songs"
 
 
 async def download_youtube_audio(input_str: str, ctx: commands.Context) -> str:
@@ -19,19 +27,19 @@ async def download_youtube_audio(input_str: str, ctx: commands.Context) -> str:
 
 
 async def _download_youtube_audio(url: str, ctx: commands.Context) -> str:
-    output_path = "music/songs"
+    output_path = MUSIC_PATH
     temp_path = os.path.join(output_path, "temp")
     os.makedirs(output_path, exist_ok=True)
     os.makedirs(temp_path, exist_ok=True)
 
-    sent_messages = []
+    progress = ProgressMessage(ctx)
     temp_audio_path = None
 
     try:
         async with asyncio.timeout(30):
-            yt = await asyncio.to_thread(YouTube, url)
+            yt = await asyncio.to_thread(pytube.YouTube, url)
             title = await asyncio.to_thread(lambda: yt.title)
-            sent_messages.append(await ctx.send(f"📥 Downloading: **{title}**"))
+            await progress.update(f"📥 Downloading: **{title}**")
 
             audio_stream = await asyncio.to_thread(
                 lambda: yt.streams.filter(only_audio=True)
@@ -43,7 +51,8 @@ async def _download_youtube_audio(url: str, ctx: commands.Context) -> str:
         if not audio_stream:
             await ctx.send("❌ No suitable audio stream found!")
 
-        sent_messages.append(await ctx.send(f"🔊 Downloading audio ({audio_stream.abr})..."))
+        await progress.update(f"🔊 Downloading audio ({audio_stream.abr})...", force=True)
+        yt.register_on_progress_callback(progress.pytube_callback(f"🔊 Downloading audio ({audio_stream.abr})"))
 
         async with asyncio.timeout(180):
             temp_audio_path = await asyncio.to_thread(
@@ -56,26 +65,22 @@ async def _download_youtube_audio(url: str, ctx: commands.Context) -> str:
         output_filename = f"{safe_title}.mp3"
         output_filepath = os.path.join(output_path, output_filename)
 
-        sent_messages.append(await ctx.send("🔄 Converting to MP3..."))
+        await progress.update("🔄 Converting to MP3...", force=True)
 
         async with asyncio.timeout(60):
             try:
-                ffmpeg.input(temp_audio_path) \
-                    .output(output_filepath,
-                            acodec='libmp3lame',
-                            audio_bitrate='192k',
-                            loglevel='error') \
-                    .overwrite_output() \
-                    .run(capture_stdout=True, capture_stderr=True)
+                await asyncio.to_thread(
+                    ffmpeg.input(temp_audio_path)
+                    .output(output_filepath, acodec='libmp3lame', audio_bitrate='192k', loglevel='error')
+                    .overwrite_output()
+                    .run,
+                    capture_stdout=True, capture_stderr=True
+                )
 
                 if temp_audio_path and os.path.exists(temp_audio_path):
                     os.remove(temp_audio_path)
 
-                sent_messages.append(await ctx.send("✅ Download complete!"))
-
-                await asyncio.sleep(5)
-                for message in sent_messages:
-                    await message.delete()
+                await progress.finish("✅ Download complete!", delete_after=5)
 
                 return output_filepath
 
@@ -104,7 +109,7 @@ async def _download_youtube_audio(url: str, ctx: commands.Context) -> str:
 
 
 async def _search_and_download_youtube_audio(search_term: str, ctx: commands.Context) -> str:
-    output_path = "music/songs"
+    output_path = MUSIC_PATH
     temp_path = os.path.join(output_path, "temp")
     os.makedirs(output_path, exist_ok=True)
     os.makedirs(temp_path, exist_ok=True)
@@ -112,13 +117,13 @@ async def _search_and_download_youtube_audio(search_term: str, ctx: commands.Con
     sent_messages = []
 
     try:
-        search = Search(search_term)
+        search = pytube.Search(search_term)
         search_results = await asyncio.to_thread(lambda: list(search.results)[:5])
 
         if not search_results:
             # If no results found, try searching for the full search term
             full_search_term = " ".join(search_term.split())
-            search = Search(full_search_term)
+            search = pytube.Search(full_search_term)
             search_results = await asyncio.to_thread(lambda: list(search.results)[:5])
 
             if not search_results:
@@ -127,6 +132,7 @@ async def _search_and_download_youtube_audio(search_term: str, ctx: commands.Con
         # Prompt user for choice
         search_msg = "\n".join(f"{i + 1}. {video.title} ({video.length // 60}:{video.length % 60})" for i, video in
                                enumerate(search_results))
+        suggestions.add_search_results(search_results)
         selection_msg = await ctx.send(f"🔍 Search results:\n{search_msg}\nType a number (1-5) to select a video.")
 
         def check(m):
@@ -148,7 +154,7 @@ async def _search_and_download_youtube_audio(search_term: str, ctx: commands.Con
         await ctx.send(str(e))
 
 
-async def download_youtube_video(url: str, ctx: discord.ext.commands.Context) -> str:
+async def download_youtube_video(url: str, ctx: discord.ext.commands.Context) -> str | io.BytesIO:
     youtube_regex = (r'^((?:https?:)?\/\/)?((?:www|m)\.)?((?:youtube(?:-nocookie)?\.com|youtu.be))(\/(?:['
                      r'\w\-]+\?v=|embed\/|live\/|v\/)?)([\w\-]+)(\S+)?$')
 
@@ -161,10 +167,10 @@ async def download_youtube_video(url: str, ctx: discord.ext.commands.Context) ->
         os.makedirs(output_path, exist_ok=True)
         os.makedirs(temp_path, exist_ok=True)
 
-        sent_messages = []
+        progress = ProgressMessage(ctx)
 
-        yt = YouTube(url)
-        sent_messages.append(await ctx.send(f"📥 Downloading: **{yt.title}**"))
+        yt = pytube.YouTube(url)
+        await progress.update(f"📥 Downloading: **{yt.title}**")
 
         video_stream = yt.streams.filter(adaptive=True,
                                          file_extension='mp4',
@@ -181,38 +187,58 @@ async def download_youtube_video(url: str, ctx: discord.ext.commands.Context) ->
         if not video_stream or not audio_stream:
             await ctx.send("❌ No suitable streams found!")
 
-        sent_messages.append(await ctx.send(f"🎥 Downloading video ({video_stream.resolution})..."))
-        video_path = video_stream.download(temp_path, filename_prefix="video_")
+        await progress.update(f"🎥 Downloading video ({video_stream.resolution})...", force=True)
+        yt.register_on_progress_callback(progress.pytube_callback(f"🎥 Downloading video ({video_stream.resolution})"))
+        video_path = await asyncio.to_thread(video_stream.download, temp_path, filename_prefix="video_")
 
-        sent_messages.append(await ctx.send(f"🔊 Downloading audio ({audio_stream.abr})..."))
-        audio_path = audio_stream.download(temp_path, filename_prefix="audio_")
+        await progress.update(f"🔊 Downloading audio ({audio_stream.abr})...", force=True)
+        yt.register_on_progress_callback(progress.pytube_callback(f"🔊 Downloading audio ({audio_stream.abr})"))
+        audio_path = await asyncio.to_thread(audio_stream.download, temp_path, filename_prefix="audio_")
 
         safe_title = "".join(c for c in yt.title if c.isalnum() or c in (' ', '-', '_')).rstrip()
         output_filename = f"{safe_title}.mp4"
         output_filepath = os.path.join(output_path, output_filename)
 
-        sent_messages.append(await ctx.send("🔄 Merging video and audio..."))
+        await progress.update("🔄 Merging video and audio...", force=True)
         try:
             input_video = ffmpeg.input(video_path)
             input_audio = ffmpeg.input(audio_path)
 
-            ffmpeg.output(input_video,
-                          input_audio,
-                          output_filepath,
-                          acodec='aac',
-                          vcodec='copy') \
-                .overwrite_output() \
-                .run(capture_stdout=True, capture_stderr=True)
+            # Clips that can be attached in this channel are muxed through an ffmpeg pipe and never touch the disk,
+            # bigger ones go to the temporary host from a file anyway
+            if (video_stream.filesize or 0) + (audio_stream.filesize or 0) <= upload_limit(ctx):
+                # A pipe isn't seekable, so the mp4 has to be fragmented
+                output, _ = await asyncio.to_thread(
+                    ffmpeg.output(input_video,
+                                  input_audio,
+                                  'pipe:',
+                                  format='mp4',
+                                  acodec='aac',
+                                  vcodec='copy',
+                                  movflags='frag_keyframe+empty_moov').run,
+                    capture_stdout=True,
+                    capture_stderr=True
+                )
+                result = io.BytesIO(output)
+                result.name = output_filename
+            else:
+                await asyncio.to_thread(
+                    ffmpeg.output(input_video,
+                                  input_audio,
+                                  output_filepath,
+                                  acodec='aac',
+                                  vcodec='copy').overwrite_output().run,
+                    capture_stdout=True,
+                    capture_stderr=True
+                )
+                result = output_filepath
 
             os.remove(video_path)
             os.remove(audio_path)
 
-            sent_messages.append(await ctx.send(f"✅ Download complete! Resolution: {video_stream.resolution}"))
-
-            for message in sent_messages:
-                await message.delete()
+            await progress.delete()
 
-            return output_filepath
+            return result
 
         except ffmpeg.Error as e:
             await ctx.send("❌ Error merging video and audio!")
@@ -232,19 +258,17 @@ async def download_reddit_video(url: str, ctx: discord.ext.commands.Context) ->
     try:
         output_path = "downloads/reddit"
         os.makedirs(output_path, exist_ok=True)
-        sent_messages = []
-
-        sent_messages.append(await ctx.send(f"📥 Downloading: **{url}**"))
+        progress = ProgressMessage(ctx)
+        await progress.update(f"📥 Downloading: **{url}**")
 
-        reddit = Downloader(max_q=True)
+        reddit = redvid.Downloader(max_q=True)
         reddit.path = output_path
         reddit.log = False
         reddit.url = url
         reddit.download()
         file_path = f"{reddit.file_name}"
 
-        for message in sent_messages:
-            await message.delete()
+        await progress.delete()
 
         return file_path
 
@@ -1,6 +1,7 @@
 from discord.ext import commands
 import discord
 import aiohttp
+from utils.metrics import metrics
 
 
 class Fun(commands.Cog):
@@ -8,7 +9,7 @@ class Fun(commands.Cog):
     @commands.hybrid_command(name="dadjoke", help="Get a random dad joke", brief="Random dad joke")
     async def dadjokes(self, ctx):
         async with ctx.typing():
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(trace_configs=[metrics.http_trace]) as session:
                 async with session.get("https://icanhazdadjoke.com/",
                                        headers={"Accept": "application/json"}) as response:
                     data = await response.json()
@@ -17,7 +18,7 @@ class Fun(commands.Cog):
     @commands.hybrid_command(name="meme", help="Get a random meme", brief="Random meme")
     async def meme(self, ctx):
         async with ctx.typing():
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(trace_configs=[metrics.http_trace]) as session:
                 async with session.get("https://meme-api.com/gimme") as response:
                     data = await response.json()
                     embed = discord.Embed(title=data["title"], url=data["postLink"])
@@ -28,7 +29,7 @@ class Fun(commands.Cog):
     @commands.hybrid_command(name="cat", help="Get a random cat image", brief="Random cat")
     async def cat(self, ctx):
         async with ctx.typing():
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(trace_configs=[metrics.http_trace]) as session:
                 async with session.get("https://api.thecatapi.com/v1/images/search") as response:
                     data = await response.json()
                     embed = discord.Embed()
@@ -38,7 +39,7 @@ class Fun(commands.Cog):
     @commands.hybrid_command(name="dog", help="Get a random dog image", brief="Random dog")
     async def dog(self, ctx):
         async with ctx.typing():
-            async with aiohttp.ClientSession() as session:
+            async with aiohttp.ClientSession(trace_configs=[metrics.http_trace]) as session:
                 async with session.get("https://dog.ceo/api/breeds/image/random") as response:
                     data = await response.json()
                     embed = discord.Embed()
@@ -46,4 +47,5 @@ class Fun(commands.Cog):
                     await ctx.send(embed=embed)
 
 
-
+async def setup(bot):
+    await bot.add_cog(Fun(bot))
@@ -1,7 +1,18 @@
 from discord.ext import commands
 import random
 import hashlib
+import heapq
 import discord
+from typing import Optional
+from utils.lazy_import import lazy_import
+
+try:
+    np = lazy_import("numpy")
+except ModuleNotFoundError:
+    # The love matrix commands fall back to get_love_score one pair at a time
+    np = None
+
+TOP_MATCHES = 10
 
 
 def get_love_score(person1, person2):
@@ -23,6 +34,69 @@ def get_love_score(person1, person2):
     return final_score
 
 
+def love_matrix(names, seed=None):
+    """
+    Scores every pair of names at once with the same features as get_love_score (ASCII sums, shared letters,
+    length factor), the SHA-256 digits and random terms are replaced by seeded noise.
+    Returns a symmetric n x n matrix of percentages with -1 on the diagonal.
+    """
+    names = [name.strip().lower() for name in names]
+    n = len(names)
+    lengths = np.array([len(name) for name in names])
+
+    # Code points padded with zeros to the longest name
+    codes = np.zeros((n, max(lengths.max(initial=0), 1)), dtype=np.uint32)
+    for i, name in enumerate(names):
+        codes[i, :len(name)] = np.frombuffer(name.encode("utf-32-le"), dtype=np.uint32)
+    ascii_sums = codes.sum(axis=1, dtype=np.int64)
+
+    # One column per distinct letter, shared letter counts are then a single matrix product
+    letters, columns = np.unique(codes, return_inverse=True)
+    present = np.zeros((n, len(letters)), dtype=np.int32)
+    present[np.repeat(np.arange(n), codes.shape[1]), columns.ravel()] = 1
+    present[:, letters == 0] = 0
+    common_letters = present @ present.T
+
+    rng = np.random.default_rng(seed)
+
+    def symmetric(values):
+        return np.triu(values) + np.triu(values, 1).T
+
+    # Roughly the range of the hash digit sum plus random_noise in get_love_score
+    noise = symmetric(rng.integers(100, 311, size=(n, n)))
+    multiplier = symmetric(rng.uniform(0.5, 1.5, size=(n, n)))
+
+    length_factor = np.abs(lengths[:, None] - lengths[None, :]) + 1
+    base_score = (ascii_sums[:, None] + ascii_sums[None, :] + noise + common_letters * 7) / length_factor
+    scores = (base_score % 100 * multiplier).astype(np.int64) % 101
+    np.fill_diagonal(scores, -1)
+    return scores
+
+
+def best_pairs(names, seed=None, limit=TOP_MATCHES):
+    """Returns (score, i, j) for the best scoring pairs of names, best first."""
+    n = len(names)
+    if np is None:
+        return heapq.nlargest(limit, ((get_love_score(names[i], names[j]), i, j)
+                                      for i in range(n) for j in range(i + 1, n)))
+
+    scores = love_matrix(names, seed)
+    first, second = np.triu_indices(n, 1)
+    pair_scores = scores[first, second]
+    top = np.argsort(pair_scores, kind="stable")[::-1][:limit]
+    return [(int(pair_scores[i]), int(first[i]), int(second[i])) for i in top]
+
+
+def best_matches(names, me, seed=None, limit=TOP_MATCHES):
+    """Returns (score, i) for the names that score best with names[me], best first."""
+    if np is None:
+        return heapq.nlargest(limit, ((get_love_score(names[me], names[i]), i)
+                                      for i in range(len(names)) if i != me))
+
+    row = love_matrix(names, seed)[me]
+    return [(int(row[i]), int(i)) for i in np.argsort(row, kind="stable")[::-1][:limit] if i != me]
+
+
 class Irl(commands.Cog):
 
     @commands.hybrid_command(name="kharchi", aliases=["kharcher", "nacer"], help="Gives all of Kharchi's Roles",
@@ -46,3 +120,41 @@ class Irl(commands.Cog):
     async def love_compatiblity(self, ctx, person1: str, person2: str):
         score = get_love_score(person1, person2)
         await ctx.send(f"Love Compatibility between {person1} and {person2} is {score}%")
+
+    @staticmethod
+    def _love_members(ctx, channel):
+        # Voice channels only, the default cache profile doesn't keep members that aren't in voice
+        if channel is None:
+            if not ctx.author.voice:
+                return None, []
+            channel = ctx.author.voice.channel
+        return channel, [member for member in channel.members if not member.bot]
+
+    @commands.hybrid_command(name="lovematrix", help="Ranks the best love matches in a voice channel",
+                             brief="Love Matrix")
+    async def top_love_matches(self, ctx, channel: Optional[discord.VoiceChannel] = None):
+        channel, members = self._love_members(ctx, channel)
+        if len(members) < 2:
+            return await ctx.send("❌ Need at least two people, join a voice channel or pick one")
+
+        pairs = best_pairs([member.display_name for member in members], seed=channel.id)
+        lines = [f"{rank}. {members[i].display_name} ❤️ {members[j].display_name}: {score}%"
+                 for rank, (score, i, j) in enumerate(pairs, 1)]
+        await ctx.send(f"💘 Top matches in {channel.name}:\n" + "\n".join(lines))
+
+    @commands.hybrid_command(name="mymatches", help="Your best love matches in a voice channel",
+                             brief="My Matches")
+    async def my_matches(self, ctx, channel: Optional[discord.VoiceChannel] = None):
+        channel, members = self._love_members(ctx, channel)
+        me = next((i for i, member in enumerate(members) if member.id == ctx.author.id), None)
+        if me is None or len(members) < 2:
+            return await ctx.send("❌ You need to be in that voice channel with at least one other person")
+
+        # Same seed as !lovematrix so both commands agree
+        matches = best_matches([member.display_name for member in members], me, seed=channel.id)
+        lines = [f"{rank}. {members[i].display_name}: {score}%" for rank, (score, i) in enumerate(matches, 1)]
+        await ctx.send(f"💘 Best matches for {ctx.author.display_name} in {channel.name}:\n" + "\n".join(lines))
+
+
+async def setup(bot):
+    await bot.add_cog(Irl(bot))
@@ -4,7 +4,10 @@ import io
 
 from discord.ext import commands
 import discord
-import STPyV8
+from utils.admission import admission
+from utils.lazy_import import lazy_import
+
+STPyV8 = lazy_import("STPyV8")
 
 
 class JavaScriptEval(commands.Cog):
@@ -18,6 +21,7 @@ class JavaScriptEval(commands.Cog):
         brief="Run JavaScript code"
     )
     @commands.cooldown(1, 1, commands.BucketType.user)
+    @admission.limit()
     async def eval_js(self, ctx: commands.Context, *, expression: str):
         """
         Evaluates JavaScript code in a sandboxed environment using STPyV8.
@@ -70,6 +74,7 @@ class JavaScriptEval(commands.Cog):
 
     @commands.hybrid_command(name="iamlucky", catalogue="Javascript")
     @commands.cooldown(1, 1, commands.BucketType.user)
+    @admission.limit()
     async def iamlucky(self, ctx: commands.Context):
         path = os.path.join(os.path.dirname(__file__), "..", "scripts", "iamlucky.js")
         try:
@@ -82,3 +87,7 @@ class JavaScriptEval(commands.Cog):
                 await ctx.send(f"```js\n{result}```")
         except FileNotFoundError:
             await ctx.send("The JS file was not found!")
+
+
+async def setup(bot):
+    await bot.add_cog(JavaScriptEval(bot))
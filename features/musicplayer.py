@@ -1,6 +1,12 @@
 import discord
+from discord import app_commands
 from features import downloader
 from discord.ext import commands
+from utils.admission import admission
+from utils.handoff import take_over
+from utils.interaction import defer_once
+from utils.metrics import TimedAudioSource
+from utils.suggestions import suggestions, RECENT
 import os
 import asyncio
 
@@ -15,6 +21,14 @@ class MusicPlayer(commands.Cog):
         self.volume = 1.0
         self.loop = False
         self.paused = False
+        # Picks up the voice connection and queue when reloaded with !reload
+        for key, value in (take_over(self.qualified_name) or {}).items():
+            setattr(self, key, value)
+        suggestions.load_library(downloader.MUSIC_PATH)
+
+    def export_state(self):
+        return {"voice_client": self.voice_client, "queue": self.queue, "now_playing": self.now_playing,
+                "volume": self.volume, "loop": self.loop, "paused": self.paused}
 
     @commands.command(name="join", help="Join the voice channel", catalogue="Music")
     async def join(self, ctx: commands.Context):
@@ -37,11 +51,14 @@ class MusicPlayer(commands.Cog):
         self.queue.clear()  # Clear the queue when leaving
         await ctx.send("🔇 Left the voice channel")
 
-    @commands.command(name="play", help="Play a song from a YouTube search", catalogue="Music")
-    async def play(self, ctx: commands.Context, *query: str):
+    @commands.hybrid_command(name="play", help="Play a song from a YouTube search", catalogue="Music")
+    @admission.limit()
+    async def play(self, ctx: commands.Context, *, query: str):
         if not ctx.author.voice:
             return await ctx.send("❌ You must be in a voice channel!")
 
+        # Connecting can take longer than the 3 second slash command deadline, admission may have deferred already
+        await defer_once(ctx)
         if self.voice_client is None:
             try:
                 self.voice_client = await ctx.author.voice.channel.connect(timeout=10)
@@ -49,8 +66,12 @@ class MusicPlayer(commands.Cog):
                 return await ctx.send(f"❌ Failed to connect: {str(e)}")
 
         try:
-            search_term = " ".join(query)
-            file_path = await downloader.download_youtube_audio(search_term, ctx)
+            # Songs picked from autocomplete may already be in the library
+            library_path = os.path.join(downloader.MUSIC_PATH, f"{query}.mp3")
+            if os.path.basename(query) == query and os.path.isfile(library_path):
+                file_path = library_path
+            else:
+                file_path = await downloader.download_youtube_audio(query, ctx)
             if not file_path or not os.path.exists(file_path):
                 return await ctx.send("❌ Error downloading audio")
 
@@ -63,6 +84,10 @@ class MusicPlayer(commands.Cog):
         except Exception as e:
             await ctx.send(str(e))
 
+    @play.autocomplete("query")
+    async def play_autocomplete(self, interaction: discord.Interaction, current: str):
+        return [app_commands.Choice(name=name, value=value) for name, value in suggestions.search(current)]
+
     async def play_next(self, ctx: commands.Context):
         if not self.queue:
             return
@@ -75,25 +100,29 @@ class MusicPlayer(commands.Cog):
                 return await self.play_next(ctx)
 
             audio_source = discord.PCMVolumeTransformer(
-                discord.FFmpegPCMAudio(
+                TimedAudioSource(discord.FFmpegPCMAudio(
                     self.now_playing,
                     options=f'-filter:a volume={self.volume}'
-                ),
+                )),
                 volume=self.volume
             )
 
             def after_playing(error):
+                # The cog may have been reloaded while this song was playing
+                cog = self.bot.get_cog(self.qualified_name) or self
                 if error:
                     asyncio.run_coroutine_threadsafe(
                         ctx.send(f"❌ Error playing audio: {error}"),
                         self.bot.loop
                     )
                 asyncio.run_coroutine_threadsafe(
-                    self.play_next(ctx),
+                    cog.play_next(ctx),
                     self.bot.loop
                 )
 
             self.voice_client.play(audio_source, after=after_playing)
+            song = os.path.splitext(os.path.basename(self.now_playing))[0]
+            suggestions.add(song, song, RECENT)
             await ctx.send(f"🎶 Now playing: {os.path.basename(self.now_playing)}")
 
         except Exception as e:
@@ -152,3 +181,7 @@ class MusicPlayer(commands.Cog):
         self.loop = not self.loop
         status = "enabled" if self.loop else "disabled"
         await ctx.send(f"🔁 Looping is now {status}")
+
+
+async def setup(bot):
+    await bot.add_cog(MusicPlayer(bot))
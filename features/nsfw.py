@@ -2,13 +2,46 @@ import discord
 from discord.ext import commands
 import random
 import aiohttp
-import xml.etree.ElementTree as ET
+import io
 import os
+from urllib.parse import urlparse
+from utils.lazy_import import lazy_import
+from utils.admission import admission
+from utils.metrics import metrics
+from utils.uploader import upload_limit
+
+ET = lazy_import("xml.etree.ElementTree")
 
 
 class NSFW(commands.Cog):
 
+    async def _fetch_spoiler_file(self, ctx: commands.Context, image_url: str, post_id):
+        # Streams the image into memory, returns None and reports to the channel if it can't be sent
+        limit = upload_limit(ctx)
+        extension = os.path.splitext(urlparse(image_url).path)[1] or ".jpg"
+
+        async with aiohttp.ClientSession(trace_configs=[metrics.http_trace]) as session:
+            async with session.get(image_url) as response:
+                if response.status != 200:
+                    await ctx.send("❌ Failed to download the image.")
+                    return None
+
+                if response.content_length and response.content_length > limit:
+                    await ctx.send(f"❌ The file is too large to upload ({response.content_length / (1024 * 1024):.2f} MB).")
+                    return None
+
+                buffer = io.BytesIO()
+                async for chunk in response.content.iter_chunked(64 * 1024):
+                    buffer.write(chunk)
+                    if buffer.tell() > limit:
+                        await ctx.send("❌ The file is too large to upload.")
+                        return None
+
+        buffer.seek(0)
+        return discord.File(buffer, filename=f"SPOILER_image_{post_id}{extension}")
+
     @commands.hybrid_command(name="r34", help="Search for a random image on rule34.xxx", brief="NSFW random search")
+    @admission.limit()
     async def r34(self, ctx: commands.Context, *, tags: str):
         if not ctx.channel.is_nsfw() and ctx.message.author.id != 363664620583518210:
             await ctx.send("🔞 This command can only be used in NSFW channels!")
@@ -16,7 +49,7 @@ class NSFW(commands.Cog):
 
         api_url = f"https://rule34.xxx/index.php?page=dapi&s=post&q=index&tags={tags}&limit=100"
 
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(trace_configs=[metrics.http_trace]) as session:
             async with session.get(api_url) as response:
                 if response.status != 200:
                     await ctx.send("❌ Failed to retrieve data from rule34.")
@@ -35,25 +68,14 @@ class NSFW(commands.Cog):
         image_url = post.get("file_url")
         post_id = post.get("id")
 
-        image_name = f"spoiler_image_{post_id}.jpg"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(image_url) as response:
-                if response.status == 200:
-                    with open(image_name, "wb") as f:
-                        f.write(await response.read())
-                else:
-                    await ctx.send("❌ Failed to download the image.")
-                    return
+        file = await self._fetch_spoiler_file(ctx, image_url, post_id)
+        if file is None:
+            return
 
-        try:
-            file = discord.File(image_name, filename=f"SPOILER_{os.path.basename(image_name)}")
-            await ctx.send(
-                content=f"🔞 Here’s a random result for `{tags}`: ||<https://rule34.xxx/index.php?page=post&s=view&id={post_id}>||",
-                file=file
-            )
-        finally:
-            if os.path.exists(image_name):
-                os.remove(image_name)
+        await ctx.send(
+            content=f"🔞 Here’s a random result for `{tags}`: ||<https://rule34.xxx/index.php?page=post&s=view&id={post_id}>||",
+            file=file
+        )
 
     @commands.hybrid_command(name="r34tags", help="Get a list of popular tags for rule34.xxx", brief="Popular tags list")
     async def r34_tags(self, ctx: commands.Context):
@@ -64,6 +86,7 @@ class NSFW(commands.Cog):
 
 
     @commands.hybrid_command(name="e621", help="Search for a random image on e621.net", brief="Purrrrfectly safe search")
+    @admission.limit()
     async def e621(self, ctx: commands.Context, *, tags: str):
         if not ctx.channel.is_nsfw() and ctx.message.author.id != 363664620583518210:
             await ctx.send("🔞 This command can only be used in NSFW channels!")
@@ -71,7 +94,7 @@ class NSFW(commands.Cog):
 
         api_url = f"https://e621.net/posts.json?tags={tags}&limit=320"
 
-        async with aiohttp.ClientSession() as session:
+        async with aiohttp.ClientSession(trace_configs=[metrics.http_trace]) as session:
             async with session.get(api_url, headers={"User-Agent": "Discord Bot"}) as response:
                 if response.status != 200:
                     await ctx.send("❌ Failed to retrieve data from e621.")
@@ -89,25 +112,14 @@ class NSFW(commands.Cog):
         image_url = post["file"]["url"]
         post_id = post["id"]
 
-        image_name = f"spoiler_image_{post_id}.jpg"
-        async with aiohttp.ClientSession() as session:
-            async with session.get(image_url) as response:
-                if response.status == 200:
-                    with open(image_name, "wb") as f:
-                        f.write(await response.read())
-                else:
-                    await ctx.send("❌ Failed to download the image.")
-                    return
+        file = await self._fetch_spoiler_file(ctx, image_url, post_id)
+        if file is None:
+            return
 
-        try:
-            file = discord.File(image_name, filename=f"SPOILER_{os.path.basename(image_name)}")
-            await ctx.send(
-                content=f"🔞 Here’s a random result for `{tags}`: ||<https://e621.net/posts/{post_id}>||",
-                file=file
-            )
-        finally:
-            if os.path.exists(image_name):
-                os.remove(image_name)
+        await ctx.send(
+            content=f"🔞 Here’s a random result for `{tags}`: ||<https://e621.net/posts/{post_id}>||",
+            file=file
+        )
 
     @commands.hybrid_command(name="e621tags", help="Get a list of popular tags for e621.net", brief="Popular tags list")
     async def e621_tags(self, ctx: commands.Context):
@@ -117,3 +129,5 @@ class NSFW(commands.Cog):
             await ctx.send("🔞 This command can only be used in NSFW channels")
 
 
+async def setup(bot):
+    await bot.add_cog(NSFW(bot))
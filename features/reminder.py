@@ -1,7 +1,9 @@
 # features/reminder.py
+import asyncio
 import json
 import re
 import os
+import sqlite3
 import time
 from datetime import datetime, timedelta
 
@@ -35,7 +37,7 @@ class ReminderSystem:
             total_seconds += value * time_units[unit]
         return total_seconds
 
-    def add_reminder(self, user_id, channel_id, time_str, message):
+    def add_reminder(self, user_id, channel_id, time_str, message, guild_id=None):
         seconds = self.parse_time(time_str)
         if seconds == 0:
             return False, "Invalid time format. Use combinations of s/m/h/d\nExample: 1d 2h 3m 4s"
@@ -43,21 +45,25 @@ class ReminderSystem:
         reminder = {
             "user_id": user_id,
             "channel_id": channel_id,
+            "guild_id": guild_id,
             "message": message,
             "target_time": target_time,
             "created_at": int(time.time())
         }
-        self.reminders.append(reminder)
-        self.save_reminders()
+        self.store_reminder(reminder)
         remind_time = datetime.fromtimestamp(target_time)
         return True, remind_time.strftime('%Y-%m-%d %H:%M:%S')
 
-    def check_reminders(self):
+    def store_reminder(self, reminder):
+        self.reminders.append(reminder)
+        self.save_reminders()
+
+    def check_reminders(self, owns=None):
         current_time = int(time.time())
         due_reminders = []
         reminders_to_keep = []
         for reminder in self.reminders:
-            if current_time >= reminder["target_time"]:
+            if current_time >= reminder["target_time"] and (owns is None or owns(reminder)):
                 reminder['time_delta'] = timedelta(seconds=current_time - reminder['created_at'])
                 due_reminders.append(reminder)
             else:
@@ -66,3 +72,71 @@ class ReminderSystem:
             self.reminders = reminders_to_keep
             self.save_reminders()
         return due_reminders
+
+    async def pop_due_reminders(self, owns=None):
+        return self.check_reminders(owns)
+
+
+class SharedReminderSystem(ReminderSystem):
+    """Keeps reminders in the SharedStore database so several bot processes can share them."""
+
+    def __init__(self, store):
+        self.store = store
+        self.reminders_file = "data/reminders.json"
+        self.store.connection.execute(
+            "CREATE TABLE IF NOT EXISTS reminders (id INTEGER PRIMARY KEY AUTOINCREMENT, target_time INTEGER NOT NULL, "
+            "data TEXT NOT NULL)"
+        )
+        self.reminders = []
+        # Claims run in a worker thread, on their own connection
+        self.claim_connection = sqlite3.connect(store.path, timeout=10, isolation_level=None,
+                                                check_same_thread=False)
+        self.import_json_reminders()
+
+    def import_json_reminders(self):
+        # Moves reminders left by the single-process ReminderSystem into the table, once.
+        # The file is renamed inside the transaction so a worker starting at the same time doesn't import it again
+        connection = self.store.connection
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            if not os.path.exists(self.reminders_file):
+                connection.execute("COMMIT")
+                return
+            reminders = self.load_reminders()
+            for reminder in reminders:
+                self.store_reminder(reminder)
+            os.replace(self.reminders_file, self.reminders_file + ".imported")
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        print(f"Imported {len(reminders)} reminders from {self.reminders_file}")
+
+    def store_reminder(self, reminder):
+        self.store.connection.execute("INSERT INTO reminders (target_time, data) VALUES (?, ?)",
+                                      (reminder["target_time"], json.dumps(reminder)))
+
+    def check_reminders(self, owns=None):
+        current_time = int(time.time())
+        due_reminders = []
+        connection = self.claim_connection
+        # Claim and delete in one transaction so two processes never send the same reminder
+        connection.execute("BEGIN IMMEDIATE")
+        try:
+            rows = connection.execute("SELECT id, data FROM reminders WHERE target_time <= ?", (current_time,)).fetchall()
+            for row_id, data in rows:
+                reminder = json.loads(data)
+                if owns is not None and not owns(reminder):
+                    continue
+                reminder['time_delta'] = timedelta(seconds=current_time - reminder['created_at'])
+                due_reminders.append(reminder)
+                connection.execute("DELETE FROM reminders WHERE id = ?", (row_id,))
+            connection.execute("COMMIT")
+        except Exception:
+            connection.execute("ROLLBACK")
+            raise
+        return due_reminders
+
+    async def pop_due_reminders(self, owns=None):
+        # Waiting for another worker's lock can take up to the busy timeout, keep it off the event loop
+        return await asyncio.to_thread(self.check_reminders, owns)
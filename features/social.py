@@ -8,6 +8,5 @@ class SocialMedia(commands.Cog):
         self.client = client
 
 
-
-
-
+async def setup(bot):
+    await bot.add_cog(SocialMedia(bot))
@@ -0,0 +1,128 @@
+"""
+Runs the bot as an AutoShardedBot spread over several worker processes and restarts crashed workers.
+
+    python launcher.py --workers 4
+    python launcher.py --workers 2 --shards 8
+
+Every worker runs main.py with SHARD_COUNT/SHARD_IDS set to its own range of shards and shares
+reminders with the others through the SQLite store at SHARED_STORE.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+import urllib.request
+
+import dotenv
+
+RESTART_BASE_DELAY = 5
+RESTART_MAX_DELAY = 300
+# A worker that stayed up this long is considered healthy again and restarts without backoff
+STABLE_UPTIME = 120
+
+
+def recommended_shard_count(token):
+    request = urllib.request.Request("https://discord.com/api/v10/gateway/bot",
+                                     headers={"Authorization": f"Bot {token}", "User-Agent": "DiscordBot"})
+    with urllib.request.urlopen(request, timeout=10) as response:
+        return json.load(response)["shards"]
+
+
+def split_shards(shard_count, workers):
+    # Contiguous ranges, the first workers get one extra shard when it doesn't divide evenly
+    workers = min(workers, shard_count)
+    size, extra = divmod(shard_count, workers)
+    ranges = []
+    start = 0
+    for i in range(workers):
+        end = start + size + (1 if i < extra else 0)
+        ranges.append(list(range(start, end)))
+        start = end
+    return ranges
+
+
+class Worker:
+    def __init__(self, index, shard_ids, shard_count, store_path):
+        self.index = index
+        self.shard_ids = shard_ids
+        self.shard_count = shard_count
+        self.store_path = store_path
+        self.process = None
+        self.started_at = 0
+        self.failures = 0
+        self.restart_at = 0
+        self.finished = False
+
+    def start(self):
+        env = dict(os.environ,
+                   SHARD_COUNT=str(self.shard_count),
+                   SHARD_IDS=",".join(str(shard_id) for shard_id in self.shard_ids),
+                   SHARED_STORE=self.store_path)
+        self.process = subprocess.Popen([sys.executable, "main.py"], env=env)
+        self.started_at = time.monotonic()
+        print(f"Worker {self.index} started (pid {self.process.pid}, shards {self.shard_ids})")
+
+    def poll(self):
+        if self.finished:
+            return
+
+        if self.process is None:
+            if time.monotonic() >= self.restart_at:
+                self.start()
+            return
+
+        code = self.process.poll()
+        if code is None:
+            return
+
+        self.process = None
+        if code == 0:
+            print(f"Worker {self.index} exited successfully.")
+            self.finished = True
+            return
+
+        if time.monotonic() - self.started_at >= STABLE_UPTIME:
+            self.failures = 0
+        delay = min(RESTART_MAX_DELAY, RESTART_BASE_DELAY * 2 ** self.failures)
+        self.failures += 1
+        self.restart_at = time.monotonic() + delay
+        print(f"Worker {self.index} crashed with exit code {code}. Restarting in {delay} seconds...")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=15)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+
+def main():
+    dotenv.load_dotenv()
+    parser = argparse.ArgumentParser(description="Sharded multi-process bot launcher")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--shards", type=int, help="Total shard count, asks Discord for the recommended count if unset")
+    parser.add_argument("--store", default="data/shared.db", help="SQLite file shared between workers")
+    args = parser.parse_args()
+
+    shard_count = args.shards or recommended_shard_count(os.getenv('DISCORD_TOKEN'))
+    workers = [Worker(i, shard_ids, shard_count, args.store)
+               for i, shard_ids in enumerate(split_shards(shard_count, args.workers))]
+    print(f"Launching {len(workers)} workers for {shard_count} shards")
+
+    try:
+        while not all(worker.finished for worker in workers):
+            for worker in workers:
+                worker.poll()
+            time.sleep(1)
+    except KeyboardInterrupt:
+        print("Stopping workers...")
+    finally:
+        for worker in workers:
+            worker.stop()
+
+
+if __name__ == "__main__":
+    main()
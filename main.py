@@ -1,44 +1,91 @@
 import discord
 import dotenv
+import hashlib
+import json
 import os
+import sys
 from discord.ext import commands
 
-from features.admin import Admin
-from features.commands import Commands
-from features.fun import Fun
-from features.irl import Irl
-from features.musicplayer import MusicPlayer
-from features.javascripteval import JavaScriptEval
-from features.nsfw import NSFW
-from features.social import SocialMedia
-from features.AmongusVoice import AmongUsVoice
+if "--profile-startup" in sys.argv:
+    from utils.lazy_import import profile_startup
+    profile_startup()
+    sys.exit(0)
+
+from utils.admission import AdmissionRejected
+from utils.cache_profile import client_options
+from utils.lazy_import import FEATURE_MODULES, warm_up
+from utils.loop_watchdog import watchdog
+from utils.metrics import metrics
 
 dotenv.load_dotenv()
-intents = discord.Intents.all()
 
-client = commands.Bot(command_prefix="!", intents=intents)
+if os.getenv("SHARD_COUNT"):
+    # Started by launcher.py, this process only runs its own range of shards
+    client = commands.AutoShardedBot(command_prefix="!",
+                                     shard_count=int(os.getenv("SHARD_COUNT")),
+                                     shard_ids=[int(shard_id) for shard_id in os.getenv("SHARD_IDS").split(",")],
+                                     **client_options())
+else:
+    client = commands.Bot(command_prefix="!", **client_options())
+
+
+COMMAND_TREE_HASH_FILE = "data/command_tree.hash"
+
+
+async def sync_tree_if_changed():
+    # Syncing is rate limited, only do it when the slash command definitions actually changed
+    payload = json.dumps([command.to_dict(client.tree) for command in client.tree.get_commands()], sort_keys=True)
+    tree_hash = hashlib.sha256(payload.encode()).hexdigest()
+
+    try:
+        with open(COMMAND_TREE_HASH_FILE, 'r') as f:
+            if f.read().strip() == tree_hash:
+                return
+    except FileNotFoundError:
+        pass
+
+    await client.tree.sync()
+    os.makedirs(os.path.dirname(COMMAND_TREE_HASH_FILE), exist_ok=True)
+    with open(COMMAND_TREE_HASH_FILE, 'w') as f:
+        f.write(tree_hash)
+    print("Command tree synced")
+
+
+@client.event
+async def setup_hook():
+    await metrics.start(client)
+    if os.getenv("LOOP_WATCHDOG_MS"):
+        watchdog.start(int(os.getenv("LOOP_WATCHDOG_MS")))
+    # Loaded as extensions so !reload can swap them in place
+    for extension in FEATURE_MODULES:
+        try:
+            await client.load_extension(extension)
+        except commands.ExtensionError as e:
+            # One broken feature, e.g. a malformed data file, shouldn't keep the rest of the bot offline
+            print(f"Failed to load {extension}: {e}")
+    # The command tree is global, one process syncing it is enough
+    shard_ids = getattr(client, "shard_ids", None)
+    if not shard_ids or 0 in shard_ids:
+        await sync_tree_if_changed()
 
 
 @client.event
 async def on_ready():
     print(f'Bot is ready: {client.user}')
-    await client.add_cog(Irl(client))
-    await client.add_cog(Fun(client))
-    await client.add_cog(NSFW(client))
-    await client.add_cog(Admin(client))
-    await client.add_cog(Commands(client))
-    await client.add_cog(MusicPlayer(client))
-    await client.add_cog(SocialMedia(client))
-    await client.add_cog(AmongUsVoice(client))
-    await client.add_cog(JavaScriptEval(client))
-    await client.change_presence(status=discord.Status.dnd)
-    await client.change_presence(activity=discord.Activity(type=discord.ActivityType.listening, name="!help"))
-    await client.tree.sync()
+    await client.change_presence(status=discord.Status.dnd,
+                                 activity=discord.Activity(type=discord.ActivityType.listening, name="!help"))
+    if os.getenv("WARM_UP_IMPORTS") == "1":
+        # on_ready fires again after every reconnect, warm_up only runs once
+        await warm_up()
 
 
 @client.event
 async def on_command_error(ctx, error):
-    if isinstance(error, commands.MissingRequiredArgument):
+    metrics.counters["command_errors"] += 1
+    metrics.record_command(ctx, failed=True)
+    if isinstance(error, AdmissionRejected):
+        await ctx.send(str(error))
+    elif isinstance(error, commands.MissingRequiredArgument):
         await ctx.send(f"❌ Missing argument: {error.param.name}")
     else:
         await ctx.send(f"❌ An error occurred: {str(error)}")
@@ -0,0 +1,135 @@
+import asyncio
+import functools
+from collections import Counter
+
+from discord.ext import commands
+
+from utils.interaction import defer_once
+
+# How much of the global capacity each heavy command takes while it runs
+COMMAND_COSTS = {
+    "download_youtube": 4,
+    "download_reddit": 3,
+    "play": 3,
+    "r34": 1,
+    "e621": 1,
+    "eval": 1,
+    "iamlucky": 1,
+}
+DEFAULT_COST = 1
+
+GLOBAL_CAPACITY = 12
+PER_USER_LIMIT = 2
+PER_GUILD_LIMIT = 4
+MAX_WAITING = 20
+WAIT_TIMEOUT = 10
+
+
+class AdmissionRejected(commands.CommandError):
+    pass
+
+
+class AdmissionController:
+    """
+    Bounds how many heavy commands run at once. Every command has a cost, the running total can't exceed
+    the global capacity, and users and guilds can only have a few heavy commands in flight each.
+    When there's no room a command waits in a bounded queue, or is rejected straight away if the queue is full.
+    """
+
+    def __init__(self, capacity=GLOBAL_CAPACITY, per_user=PER_USER_LIMIT, per_guild=PER_GUILD_LIMIT,
+                 max_waiting=MAX_WAITING, wait_timeout=WAIT_TIMEOUT):
+        self.capacity = capacity
+        self.per_user = per_user
+        self.per_guild = per_guild
+        self.max_waiting = max_waiting
+        self.wait_timeout = wait_timeout
+        self.in_use = 0
+        self.waiting = 0
+        self.rejected = 0
+        self.by_user = Counter()
+        self.by_guild = Counter()
+        self.condition = asyncio.Condition()
+
+    async def acquire(self, ctx):
+        name = ctx.command.qualified_name if ctx.command else None
+        cost = min(COMMAND_COSTS.get(name, DEFAULT_COST), self.capacity)
+        user_id = ctx.author.id
+        guild_id = ctx.guild.id if ctx.guild else None
+
+        if self.by_user[user_id] >= self.per_user:
+            self._reject(f"⏳ You already have {self.by_user[user_id]} heavy commands running, wait for them to finish.")
+        if guild_id and self.by_guild[guild_id] >= self.per_guild:
+            self._reject("⏳ This server has too many heavy commands running, try again in a bit.")
+
+        # Hold the user and guild slots while queued so nobody can pile up waiters
+        self.by_user[user_id] += 1
+        if guild_id:
+            self.by_guild[guild_id] += 1
+
+        try:
+            if self.in_use + cost > self.capacity:
+                if self.waiting >= self.max_waiting:
+                    self._reject("🚦 The bot is at capacity right now, try again in a bit.")
+
+                await defer_once(ctx)
+                self.waiting += 1
+                try:
+                    async with self.condition:
+                        await asyncio.wait_for(self.condition.wait_for(lambda: self.in_use + cost <= self.capacity),
+                                               self.wait_timeout)
+                except asyncio.TimeoutError:
+                    self._reject("🚦 The bot is still busy, try again in a bit.")
+                finally:
+                    self.waiting -= 1
+        except BaseException:
+            self._release_slots(user_id, guild_id)
+            raise
+
+        self.in_use += cost
+        ctx.admission = (cost, user_id, guild_id)
+
+    async def release(self, ctx):
+        ticket = getattr(ctx, "admission", None)
+        if ticket is None:
+            return
+        ctx.admission = None
+
+        cost, user_id, guild_id = ticket
+        self.in_use -= cost
+        self._release_slots(user_id, guild_id)
+        async with self.condition:
+            self.condition.notify_all()
+
+    def limit(self):
+        """
+        Decorator for heavy commands, put it under the command decorator.
+        Wraps the callback itself rather than using invoke hooks: discord.py skips the after hooks
+        of a slash command whose callback raised, which would leak its slot.
+        """
+        def decorator(func):
+            @functools.wraps(func)
+            async def wrapper(*args, **kwargs):
+                ctx = args[1] if isinstance(args[0], commands.Cog) else args[0]
+                await self.acquire(ctx)
+                try:
+                    return await func(*args, **kwargs)
+                finally:
+                    await self.release(ctx)
+            return wrapper
+        return decorator
+
+    def _reject(self, message):
+        self.rejected += 1
+        raise AdmissionRejected(message)
+
+    def _release_slots(self, user_id, guild_id):
+        self.by_user[user_id] -= 1
+        if self.by_user[user_id] <= 0:
+            del self.by_user[user_id]
+        if guild_id:
+            self.by_guild[guild_id] -= 1
+            if self.by_guild[guild_id] <= 0:
+                del self.by_guild[guild_id]
+
+
+admission = AdmissionController()
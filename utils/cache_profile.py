@@ -0,0 +1,35 @@
+import os
+import discord
+
+# BOT_CACHE_PROFILE=voice (default) only caches members that are in a voice channel, which is all the voice cogs need.
+# BOT_CACHE_PROFILE=full restores the old behaviour: every intent, every member, guilds chunked at startup.
+# CHUNK_GUILDS=1 turns chunking on for either profile.
+
+
+def client_options(profile=None):
+    profile = profile or os.getenv("BOT_CACHE_PROFILE", "voice")
+
+    if profile == "full":
+        intents = discord.Intents.all()
+        member_cache_flags = discord.MemberCacheFlags.all()
+        chunk_guilds = True
+    elif profile == "voice":
+        intents = discord.Intents.default()
+        intents.message_content = True
+        intents.voice_states = True
+        intents.presences = False
+        intents.members = False
+        member_cache_flags = discord.MemberCacheFlags.none()
+        member_cache_flags.voice = True
+        chunk_guilds = False
+    else:
+        raise ValueError(f"Unknown cache profile: {profile}")
+
+    if os.getenv("CHUNK_GUILDS") == "1":
+        chunk_guilds = True
+
+    return {
+        "intents": intents,
+        "member_cache_flags": member_cache_flags,
+        "chunk_guilds_at_startup": chunk_guilds,
+    }
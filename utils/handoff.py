@@ -0,0 +1,23 @@
+# State waiting to be picked up by a reloaded cog, keyed by cog name.
+# Lives outside features/ so it survives the extension reload itself
+_pending = {}
+
+
+def hand_off(cog):
+    """Stashes the long-lived state of a cog that is about to be reloaded, if it has any."""
+    export_state = getattr(cog, "export_state", None)
+    if export_state is not None:
+        _pending[cog.qualified_name] = export_state()
+
+
+def take_over(name):
+    """
+    Returns the state left by the previous instance of the cog, or None on a normal start.
+    The state stays stashed until finish_reload, so if the new version fails to load,
+    the old version discord.py sets up again takes over the same state.
+    """
+    return _pending.get(name)
+
+
+def finish_reload(name):
+    _pending.pop(name, None)
@@ -0,0 +1,4 @@
+async def defer_once(ctx):
+    """Defers a slash command's response unless something already did, a second defer raises InteractionResponded."""
+    if ctx.interaction and not ctx.interaction.response.is_done():
+        await ctx.defer()
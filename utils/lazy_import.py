@@ -0,0 +1,91 @@
+import asyncio
+import importlib
+import importlib.util
+import sys
+import time
+
+FEATURE_MODULES = [
+    "features.admin",
+    "features.commands",
+    "features.fun",
+    "features.irl",
+    "features.musicplayer",
+    "features.javascripteval",
+    "features.nsfw",
+    "features.social",
+    "features.AmongusVoice",
+]
+
+# Names handed out by lazy_import, so they can be warmed up or profiled later
+lazy_modules = []
+_warmed_up = False
+
+
+def lazy_import(name):
+    """
+    Returns a module that only really gets imported the first time one of its attributes is used.
+    Use it for heavy dependencies that only some commands need, e.g. `STPyV8 = lazy_import("STPyV8")`.
+    """
+    if name in sys.modules:
+        return sys.modules[name]
+
+    spec = importlib.util.find_spec(name)
+    if spec is None:
+        raise ModuleNotFoundError(f"No module named '{name}'", name=name)
+    if name not in lazy_modules:
+        lazy_modules.append(name)
+
+    loader = importlib.util.LazyLoader(spec.loader)
+    spec.loader = loader
+    module = importlib.util.module_from_spec(spec)
+    sys.modules[name] = module
+    loader.exec_module(module)
+    return module
+
+
+def load(name):
+    # Any attribute access makes a lazy module execute for real
+    return getattr(sys.modules.get(name) or importlib.import_module(name), "__name__")
+
+
+async def warm_up():
+    """
+    Loads every lazy dependency once the bot is connected, yielding to the event loop between modules.
+    Runs on the loop thread: before Python 3.12 a lazy module has no lock, and a worker thread loading it
+    while a command touches it can execute the module twice. Only the first call does anything.
+    """
+    global _warmed_up
+    if _warmed_up:
+        return
+    _warmed_up = True
+    for name in list(lazy_modules):
+        try:
+            load(name)
+        except Exception as e:
+            print(f"Failed to warm up {name}: {e}")
+        await asyncio.sleep(0)
+
+
+def profile_startup():
+    """Prints how long each feature module and each lazy dependency takes to import."""
+    timings = []
+    for name in FEATURE_MODULES:
+        started = time.perf_counter()
+        try:
+            importlib.import_module(name)
+        except Exception as e:
+            print(f"Failed to import {name}: {e}")
+        timings.append((name, time.perf_counter() - started))
+
+    for name in list(lazy_modules):
+        started = time.perf_counter()
+        try:
+            load(name)
+        except Exception as e:
+            print(f"Failed to load {name}: {e}")
+        timings.append((f"{name} (lazy)", time.perf_counter() - started))
+
+    print(f"{'module':<32} {'ms':>10}")
+    for name, seconds in sorted(timings, key=lambda timing: timing[1], reverse=True):
+        print(f"{name:<32} {seconds * 1000:>10.1f}")
+    print(f"{'total':<32} {sum(seconds for _, seconds in timings) * 1000:>10.1f}")
@@ -0,0 +1,94 @@
+import asyncio
+import os
+import sys
+import threading
+import time
+import traceback
+
+PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class LoopWatchdog:
+    """
+    Watches the event loop from a separate thread. When the loop hasn't ticked for longer than the threshold,
+    the stack of whatever is running on the loop thread is captured and the stall is added to the report.
+    """
+
+    def __init__(self, threshold_ms=100):
+        self.threshold = threshold_ms / 1000
+        self.offenders = {}
+        self.last_tick = time.monotonic()
+        self._loop_thread_id = None
+        self._tick_task = None
+        self._thread = None
+        self._stopped = threading.Event()
+        self._lock = threading.Lock()
+
+    def start(self, threshold_ms=None):
+        if threshold_ms:
+            self.threshold = threshold_ms / 1000
+        self._loop_thread_id = threading.get_ident()
+        self.last_tick = time.monotonic()
+        self._tick_task = asyncio.create_task(self._tick())
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stopped.set()
+        if self._tick_task:
+            self._tick_task.cancel()
+
+    async def _tick(self):
+        while True:
+            self.last_tick = time.monotonic()
+            await asyncio.sleep(self.threshold / 4)
+
+    def _watch(self):
+        stall = None
+        stall_duration = 0.0
+        while not self._stopped.wait(self.threshold / 4):
+            blocked_for = time.monotonic() - self.last_tick
+            if blocked_for > self.threshold:
+                if stall is None:
+                    frame = sys._current_frames().get(self._loop_thread_id)
+                    stall = self._describe(frame)
+                stall_duration = blocked_for
+            elif stall is not None:
+                self._record(stall, stall_duration)
+                stall = None
+
+    @staticmethod
+    def _describe(frame):
+        stack = traceback.extract_stack(frame) if frame else []
+        # Group by the innermost frame in our own code, that's the line that needs fixing
+        own_frames = [entry for entry in stack
+                      if entry.filename.startswith(PROJECT_ROOT) and "site-packages" not in entry.filename]
+        location = own_frames[-1] if own_frames else (stack[-1] if stack else None)
+        key = f"{os.path.relpath(location.filename, PROJECT_ROOT)}:{location.lineno} in {location.name}" \
+            if location else "unknown"
+        return key, "".join(traceback.format_list(stack[-8:]))
+
+    def _record(self, stall, duration):
+        key, stack = stall
+        with self._lock:
+            entry = self.offenders.setdefault(key, {"count": 0, "total": 0.0, "max": 0.0, "stack": stack})
+            entry["count"] += 1
+            entry["total"] += duration
+            entry["max"] = max(entry["max"], duration)
+
+    def report(self, top=10, with_stacks=False):
+        with self._lock:
+            ranked = sorted(self.offenders.items(), key=lambda item: item[1]["total"], reverse=True)[:top]
+        if not ranked:
+            return "No event loop stalls recorded."
+
+        lines = []
+        for key, entry in ranked:
+            lines.append(f"{key}: {entry['count']}x, total {entry['total'] * 1000:.0f}ms, "
+                         f"max {entry['max'] * 1000:.0f}ms")
+            if with_stacks:
+                lines.append(entry["stack"])
+        return "\n".join(lines)
+
+
+watchdog = LoopWatchdog()
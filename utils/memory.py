@@ -0,0 +1,17 @@
+import os
+import sys
+
+
+def current_rss():
+    """Resident set size of this process in bytes, or None if it can't be determined."""
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss
+    except ImportError:
+        pass
+
+    if sys.platform.startswith("linux"):
+        with open("/proc/self/statm", 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+
+    return None
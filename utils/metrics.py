@@ -0,0 +1,204 @@
+import asyncio
+import os
+import time
+from bisect import bisect_left
+from collections import defaultdict
+from urllib.parse import urlparse
+
+import aiohttp
+import discord
+from aiohttp import web
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+LAG_INTERVAL = 0.5
+# discord.py asks the audio source for a 20ms frame, anything slower than that starves the player
+FRAME_DURATION = 0.02
+
+
+class Histogram:
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q):
+        # Upper bound of the bucket the quantile falls into, good enough for a status command
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets + (float("inf"),), self.counts):
+            seen += count
+            if seen >= target:
+                return bound
+        return float("inf")
+
+
+class Metrics:
+    def __init__(self):
+        self.command_latency = defaultdict(Histogram)
+        self.command_results = defaultdict(int)
+        self.http_latency = defaultdict(Histogram)
+        self.http_errors = defaultdict(int)
+        self.counters = defaultdict(int)
+        self.loop_lag = 0.0
+        self.max_loop_lag = 0.0
+        self.http_trace = self._build_http_trace()
+        self._lag_task = None
+        self._runner = None
+
+    # Commands
+
+    async def before_invoke(self, ctx):
+        ctx.metrics_started = time.perf_counter()
+
+    async def after_invoke(self, ctx):
+        self.record_command(ctx)
+
+    def record_command(self, ctx, failed=None):
+        """
+        Records a finished command's latency and result, once. Called from the after hook and from on_command_error,
+        since discord.py skips the after hooks of a slash command whose callback raised.
+        """
+        started = getattr(ctx, "metrics_started", None)
+        if started is None or ctx.command is None:
+            return
+        ctx.metrics_started = None
+        name = ctx.command.qualified_name
+        failed = ctx.command_failed if failed is None else failed
+        self.command_latency[name].observe(time.perf_counter() - started)
+        self.command_results[(name, "error" if failed else "success")] += 1
+
+    # External HTTP
+
+    def _build_http_trace(self):
+        trace = aiohttp.TraceConfig()
+
+        async def on_start(session, context, params):
+            context.started = time.perf_counter()
+
+        async def on_end(session, context, params):
+            self.http_latency[params.url.host].observe(time.perf_counter() - context.started)
+
+        async def on_exception(session, context, params):
+            self.http_errors[params.url.host] += 1
+
+        trace.on_request_start.append(on_start)
+        trace.on_request_end.append(on_end)
+        trace.on_request_exception.append(on_exception)
+        return trace
+
+    def observe_http(self, url, seconds):
+        # For the few places that still use requests instead of aiohttp
+        self.http_latency[urlparse(url).hostname].observe(seconds)
+
+    # Event loop
+
+    async def _watch_loop_lag(self):
+        while True:
+            expected = time.perf_counter() + LAG_INTERVAL
+            await asyncio.sleep(LAG_INTERVAL)
+            self.loop_lag = max(0.0, time.perf_counter() - expected)
+            self.max_loop_lag = max(self.max_loop_lag, self.loop_lag)
+
+    # Exposition
+
+    def render(self):
+        lines = ["# TYPE bot_command_latency_seconds histogram"]
+        for name, histogram in sorted(self.command_latency.items()):
+            lines.extend(_render_histogram("bot_command_latency_seconds", f'command="{name}"', histogram))
+
+        lines.append("# TYPE bot_commands_total counter")
+        for (name, result), count in sorted(self.command_results.items()):
+            lines.append(f'bot_commands_total{{command="{name}",result="{result}"}} {count}')
+
+        lines.append("# TYPE bot_http_request_seconds histogram")
+        for host, histogram in sorted(self.http_latency.items()):
+            lines.extend(_render_histogram("bot_http_request_seconds", f'host="{host}"', histogram))
+
+        lines.append("# TYPE bot_http_errors_total counter")
+        for host, count in sorted(self.http_errors.items()):
+            lines.append(f'bot_http_errors_total{{host="{host}"}} {count}')
+
+        for name, count in sorted(self.counters.items()):
+            lines.append(f"# TYPE bot_{name}_total counter")
+            lines.append(f"bot_{name}_total {count}")
+
+        lines.append("# TYPE bot_event_loop_lag_seconds gauge")
+        lines.append(f"bot_event_loop_lag_seconds {self.loop_lag:.6f}")
+        lines.append("# TYPE bot_event_loop_lag_max_seconds gauge")
+        lines.append(f"bot_event_loop_lag_max_seconds {self.max_loop_lag:.6f}")
+        return "\n".join(lines) + "\n"
+
+    async def _serve(self, request):
+        return web.Response(text=self.render(), content_type="text/plain")
+
+    async def start(self, bot):
+        """Hooks the metrics into every command and starts the lag monitor and, if METRICS_PORT is set, the endpoint."""
+        bot.before_invoke(self.before_invoke)
+        bot.after_invoke(self.after_invoke)
+        self._lag_task = asyncio.create_task(self._watch_loop_lag())
+
+        port = os.getenv("METRICS_PORT")
+        if port:
+            # Workers started by launcher.py share the environment, each one offsets the port by its first shard
+            port = int(port) + min(getattr(bot, "shard_ids", None) or [0])
+            app = web.Application()
+            app.router.add_get("/metrics", self._serve)
+            self._runner = web.AppRunner(app)
+            await self._runner.setup()
+            try:
+                await web.TCPSite(self._runner, "127.0.0.1", port).start()
+            except OSError as e:
+                print(f"Failed to start the metrics endpoint on port {port}: {e}")
+                await self._runner.cleanup()
+                self._runner = None
+                return
+            print(f"Metrics available on http://127.0.0.1:{port}/metrics")
+
+    async def stop(self):
+        if self._lag_task:
+            self._lag_task.cancel()
+        if self._runner:
+            await self._runner.cleanup()
+
+
+def _render_histogram(name, labels, histogram):
+    lines = []
+    cumulative = 0
+    for bound, count in zip(histogram.buckets, histogram.counts):
+        cumulative += count
+        lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+    lines.append(f'{name}_bucket{{{labels},le="+Inf"}} {histogram.count}')
+    lines.append(f"{name}_sum{{{labels}}} {histogram.total:.6f}")
+    lines.append(f"{name}_count{{{labels}}} {histogram.count}")
+    return lines
+
+
+class TimedAudioSource(discord.AudioSource):
+    """Wraps an audio source and counts the frames that took longer to produce than they last."""
+
+    def __init__(self, original):
+        self.original = original
+
+    def read(self):
+        started = time.perf_counter()
+        data = self.original.read()
+        if time.perf_counter() - started > FRAME_DURATION:
+            metrics.counters["voice_underruns"] += 1
+        return data
+
+    def is_opus(self):
+        return self.original.is_opus()
+
+    def cleanup(self):
+        self.original.cleanup()
+
+
+metrics = Metrics()
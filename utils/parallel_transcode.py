@@ -0,0 +1,88 @@
+import os
+import shutil
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+from utils.lazy_import import lazy_import
+
+ffmpeg = lazy_import("ffmpeg")
+
+# Below this the split/concat overhead costs more than the extra cores save
+MIN_PARALLEL_DURATION = 120
+MIN_SEGMENT_DURATION = 30
+
+
+def probe(input_path):
+    """Returns (duration in seconds, whether there is an audio stream), (0.0, False) if ffprobe can't read it."""
+    try:
+        info = ffmpeg.probe(input_path)
+        duration = float(info["format"]["duration"])
+    except (ffmpeg.Error, OSError, KeyError, ValueError):
+        return 0.0, False
+    return duration, any(stream.get("codec_type") == "audio" for stream in info.get("streams", []))
+
+
+def transcode(input_path, output_path, video_kwargs, audio_kwargs=None, workers=None,
+              min_duration=MIN_PARALLEL_DURATION):
+    """
+    Transcodes input_path into output_path with the given ffmpeg output options for the video and audio streams.
+    Long inputs have their video cut into time segments that are encoded by separate ffmpeg processes at the same
+    time, while one more process encodes the whole audio track. The segments are joined with the concat demuxer and
+    muxed with the audio without re-encoding. Short inputs use a single ffmpeg process.
+    The audio is never cut, so there are no encoder delay gaps at the joins. Meant for video outputs, audio-only
+    conversions should run ffmpeg directly.
+    Blocking, run it in a thread from async code. Raises ffmpeg.Error like a plain ffmpeg run would.
+    """
+    audio_kwargs = audio_kwargs or {}
+    workers = workers or os.cpu_count() or 1
+    duration, has_audio = probe(input_path) if workers > 1 else (0.0, False)
+    segments = min(workers, int(duration // MIN_SEGMENT_DURATION))
+
+    if duration < min_duration or segments < 2:
+        _encode(input_path, output_path, {**video_kwargs, **audio_kwargs})
+        return
+
+    extension = os.path.splitext(output_path)[1]
+    segment_duration = duration / segments
+    work_dir = tempfile.mkdtemp(prefix="transcode_", dir=os.path.dirname(output_path) or None)
+    try:
+        segment_paths = [os.path.join(work_dir, f"segment_{i:03d}{extension}") for i in range(segments)]
+        audio_path = os.path.join(work_dir, f"audio{extension}")
+
+        # Each encode is its own ffmpeg process, the threads only wait on them
+        with ThreadPoolExecutor(max_workers=segments + has_audio) as pool:
+            futures = [
+                pool.submit(_encode, input_path, segment_path, {**video_kwargs, "an": None}, i * segment_duration,
+                            None if i == segments - 1 else segment_duration)
+                for i, segment_path in enumerate(segment_paths)
+            ]
+            if has_audio:
+                futures.append(pool.submit(_encode, input_path, audio_path, {**audio_kwargs, "vn": None}))
+            for future in futures:
+                future.result()
+
+        list_path = os.path.join(work_dir, "segments.txt")
+        with open(list_path, 'w') as f:
+            for segment_path in segment_paths:
+                f.write(f"file '{os.path.abspath(segment_path)}'\n")
+
+        streams = [ffmpeg.input(list_path, format='concat', safe=0)]
+        if has_audio:
+            streams.append(ffmpeg.input(audio_path))
+        ffmpeg.output(*streams, output_path, c='copy', loglevel='error') \
+            .overwrite_output() \
+            .run(capture_stdout=True, capture_stderr=True)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+
+def _encode(input_path, output_path, output_kwargs, start=None, length=None):
+    input_kwargs = {}
+    if start:
+        input_kwargs["ss"] = start
+    if length:
+        input_kwargs["t"] = length
+
+    ffmpeg.input(input_path, **input_kwargs) \
+        .output(output_path, **{"loglevel": "error", **output_kwargs}) \
+        .overwrite_output() \
+        .run(capture_stdout=True, capture_stderr=True)
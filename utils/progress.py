@@ -0,0 +1,90 @@
+import asyncio
+import time
+
+BAR_LENGTH = 20
+
+
+def render_bytes(label, done, total):
+    if not total:
+        return f"{label} {done / (1024 * 1024):.1f} MB"
+    filled = int(BAR_LENGTH * done / total)
+    return (f"{label} `{'█' * filled}{'░' * (BAR_LENGTH - filled)}` "
+            f"{done / (1024 * 1024):.1f}/{total / (1024 * 1024):.1f} MB ({done * 100 // total}%)")
+
+
+class ProgressMessage:
+    """
+    One status message per job. The first update sends it, later updates edit it,
+    at most once every `min_interval` seconds; the newest text always ends up shown.
+    """
+
+    def __init__(self, ctx, min_interval=1.0):
+        self.ctx = ctx
+        self.min_interval = min_interval
+        self.message = None
+        self.text = None
+        self.shown = None
+        self.last_edit = 0.0
+        self.loop = asyncio.get_running_loop()
+        self.closed = False
+        self._flush_task = None
+
+    async def update(self, text, force=False):
+        if self.closed:
+            return
+        self.text = text
+        if self.message is None:
+            self.message = await self.ctx.send(text)
+            self.shown = text
+            self.last_edit = time.monotonic()
+            return
+
+        wait = self.min_interval - (time.monotonic() - self.last_edit)
+        if force or wait <= 0:
+            self._cancel_flush()
+            await self._flush()
+        elif self._flush_task is None:
+            self._flush_task = asyncio.create_task(self._delayed_flush(wait))
+
+    def update_bytes(self, label, done, total):
+        # Safe to call from the worker threads downloads run in
+        text = render_bytes(label, done, total)
+        self.loop.call_soon_threadsafe(lambda: asyncio.ensure_future(self.update(text)))
+
+    def pytube_callback(self, label):
+        def on_progress(stream, chunk, bytes_remaining):
+            self.update_bytes(label, stream.filesize - bytes_remaining, stream.filesize)
+        return on_progress
+
+    async def finish(self, text, delete_after=None):
+        self.closed = True
+        self._cancel_flush()
+        if self.message is None:
+            self.message = await self.ctx.send(text, delete_after=delete_after)
+        else:
+            await self.message.edit(content=text, delete_after=delete_after)
+        self.text = self.shown = text
+
+    async def delete(self):
+        self.closed = True
+        self._cancel_flush()
+        if self.message is not None:
+            await self.message.delete()
+            self.message = None
+
+    async def _delayed_flush(self, wait):
+        await asyncio.sleep(wait)
+        self._flush_task = None
+        await self._flush()
+
+    async def _flush(self):
+        if self.closed or self.message is None or self.text == self.shown:
+            return
+        self.shown = self.text
+        self.last_edit = time.monotonic()
+        await self.message.edit(content=self.text)
+
+    def _cancel_flush(self):
+        if self._flush_task is not None:
+            self._flush_task.cancel()
+            self._flush_task = None
@@ -0,0 +1,18 @@
+import os
+import sqlite3
+
+
+class SharedStore:
+    """
+    SQLite database shared by every bot process on the machine, in WAL mode so readers don't block the writer.
+    Features create their own tables on `connection`.
+    """
+
+    def __init__(self, path="data/shared.db"):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.path = path
+        self.connection = sqlite3.connect(path, timeout=10, isolation_level=None)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+
+    def close(self):
+        self.connection.close()
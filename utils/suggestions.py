@@ -0,0 +1,94 @@
+import os
+import re
+import time
+from bisect import bisect_left, insort
+
+MAX_ENTRIES = 2000
+MAX_CHOICES = 25
+# Discord rejects autocomplete choices with a name or value longer than this
+MAX_CHOICE_LENGTH = 100
+
+LIBRARY = "library"
+RECENT = "recent"
+SEARCH = "search"
+# Lower sorts first
+SOURCE_RANK = {RECENT: 0, LIBRARY: 1, SEARCH: 2}
+
+
+def _words(text):
+    return re.findall(r"\w+", text.lower())
+
+
+class SuggestionIndex:
+    """
+    In-memory word-prefix index for /play autocomplete, fed by the local library, recent plays and
+    cached YouTube search results. Lookups never leave the process, so they answer well within Discord's deadline.
+    """
+
+    def __init__(self, max_entries=MAX_ENTRIES):
+        self.max_entries = max_entries
+        self.entries = {}
+        self.words = []
+
+    def add(self, name, value, source):
+        name = name[:MAX_CHOICE_LENGTH]
+        if len(value) > MAX_CHOICE_LENGTH:
+            return
+
+        entry = self.entries.get(value)
+        if entry is None:
+            self.entries[value] = {"name": name, "source": source, "used": time.time()}
+            for word in set(_words(name)):
+                insort(self.words, (word, value))
+            if len(self.entries) > self.max_entries:
+                self._evict()
+        else:
+            entry["used"] = time.time()
+            if SOURCE_RANK[source] < SOURCE_RANK[entry["source"]]:
+                entry["source"] = source
+
+    def add_search_results(self, videos):
+        for video in videos:
+            self.add(video.title, video.watch_url, SEARCH)
+
+    def load_library(self, path):
+        if not os.path.isdir(path):
+            return
+        for entry in os.scandir(path):
+            if entry.is_file() and entry.name.endswith(".mp3"):
+                stem = entry.name[:-4]
+                self.add(stem, stem, LIBRARY)
+
+    def search(self, text, limit=MAX_CHOICES):
+        tokens = _words(text)
+        if not tokens:
+            candidates = list(self.entries)
+        else:
+            # Scan the sorted word list for the first token, then check the rest against each candidate
+            first = tokens[0]
+            candidates = set()
+            i = bisect_left(self.words, (first, ""))
+            while i < len(self.words) and self.words[i][0].startswith(first):
+                candidates.add(self.words[i][1])
+                i += 1
+            if len(tokens) > 1:
+                candidates = [value for value in candidates
+                              if all(any(word.startswith(token) for word in _words(self.entries[value]["name"]))
+                                     for token in tokens[1:])]
+
+        ranked = sorted(candidates,
+                        key=lambda value: (SOURCE_RANK[self.entries[value]["source"]], -self.entries[value]["used"]))
+        return [(self.entries[value]["name"], value) for value in ranked[:limit]]
+
+    def _evict(self):
+        # Drop the oldest cached search results first, the library and recent plays are worth keeping.
+        # Trims to 90% so the word list isn't rebuilt on every insert once full
+        overflow = len(self.entries) - int(self.max_entries * 0.9)
+        oldest = sorted(self.entries, key=lambda value: (-SOURCE_RANK[self.entries[value]["source"]],
+                                                         self.entries[value]["used"]))[:overflow]
+        for value in oldest:
+            del self.entries[value]
+        self.words = [item for item in self.words if item[1] in self.entries]
+
+
+suggestions = SuggestionIndex()
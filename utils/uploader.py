@@ -1,10 +1,24 @@
-import requests
+import time
+from utils.lazy_import import lazy_import
+from utils.metrics import metrics
+
+requests = lazy_import("requests")
+
+# Discord's attachment limit outside of a guild, or for a guild without boosts
+DEFAULT_UPLOAD_LIMIT = 8 * 1024 * 1024
+
+
+def upload_limit(ctx):
+    """The largest attachment the bot can send in ctx's channel, in bytes."""
+    return ctx.guild.filesize_limit if ctx.guild else DEFAULT_UPLOAD_LIMIT
 
 
 def upload_to_temp(file_path):
     url = "https://tmpfiles.org/api/v1/upload"
+    started = time.perf_counter()
     with open(file_path, 'rb') as file:
         response = requests.post(url, files={"file": file})
+    metrics.observe_http(url, time.perf_counter() - started)
     if response.status_code == 200:
         data = response.json()
         return data.get("data", {}).get("url")
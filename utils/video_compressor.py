@@ -1,7 +1,16 @@
-import ffmpeg
+import asyncio
 import os
+from utils.lazy_import import lazy_import
+from utils.parallel_transcode import transcode
+
+ffmpeg = lazy_import("ffmpeg")
 
 async def compress_file(file_path):
+    """
+    Re-encodes a video at lower bitrates until it fits in 8MB, returns the path of the compressed copy.
+    Not called anywhere in the bot at the moment, downloads over the upload limit go to the temporary host instead.
+    benchmarks/transcode_bench.py exercises the same transcode options.
+    """
     max_size = 8 * 1024 * 1024
     compressed_file_path = os.path.join(
         os.path.dirname(file_path), f"compressed_{os.path.basename(file_path)}"
@@ -10,12 +19,8 @@ async def compress_file(file_path):
 
     while True:
         try:
-            (
-                ffmpeg
-                .input(file_path)
-                .output(compressed_file_path, video_bitrate=bitrate, vf='scale=-1:720')
-                .run(overwrite_output=True, capture_stdout=True, capture_stderr=True)
-            )
+            await asyncio.to_thread(transcode, file_path, compressed_file_path,
+                                    {"video_bitrate": bitrate, "vf": 'scale=-1:720'})
         except ffmpeg.Error as e:
             error_message = e.stderr.decode() if e.stderr else "Unknown error"
             print("An error occurred during compression:", error_message)
@@ -0,0 +1,24 @@
+import asyncio
+
+# discord.py already retries on 429s, this just keeps us from firing a whole lobby at the bucket at once
+DEFAULT_CONCURRENCY = 5
+
+
+async def set_mute(members, mute: bool, concurrency: int = DEFAULT_CONCURRENCY):
+    """
+    Server mutes or unmutes every member that isn't already in the target state.
+    Edits run concurrently, bounded by `concurrency`.
+    Returns a list of (member, exception) tuples for the edits that failed.
+    """
+    targets = [member for member in members if member.voice and member.voice.mute != mute]
+    if not targets:
+        return []
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def edit(member):
+        async with semaphore:
+            await member.edit(mute=mute)
+
+    results = await asyncio.gather(*(edit(member) for member in targets), return_exceptions=True)
+    return [(member, result) for member, result in zip(targets, results) if isinstance(result, Exception)]